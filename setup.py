@@ -25,6 +25,7 @@ setup(
     packages=['sublimedsl'],
     scripts=[],
     install_requires=['funcy>=1.0'],
+    extras_require={'orjson': ['orjson']},
     classifiers=[
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,365 @@
+"""
+Build runner that generates many configs from their DSL sources in one process.
+
+A DSL source (target) is a Python script named after the generated file with
+suffix ``.py`` (e.g. ``Default.sublime-keymap.py``) that writes the config to
+stdout, typically using :meth:`Keymap.dump() <sublimedsl.keymap.Keymap.dump>`.
+The output is written next to the source (e.g. to ``Default.sublime-keymap``).
+
+All the targets in a directory are executed in the same process, one after
+another, and the modules they import from their directory (i.e. shared
+fragments) are evaluated only once, by the first target that imports them.
+The build time thus scales with the number of distinct fragments rather than
+with the number of targets times the fragments.
+
+The targets share the fragments' objects, so they must not modify them in
+place; :class:`~sublimedsl.keymap.Keymap` copies the given bindings, so each
+target gets its own isolated view. With *verify* (``--verify`` on the command
+line), digests of the content (see :func:`~sublimedsl.fingerprint.content_digest`)
+of the bindings and keymaps in the fragments are checked after each target;
+a fragment modified by a target is reported and evaluated again for the next
+targets. This rehashes all the fragments after each target, so it's off by
+default.
+
+The imports are tracked only in the targets and the local modules: they are
+executed with their own ``__builtins__`` with a recording ``__import__``, so
+:func:`builtins.__import__` is not replaced. However, the build changes
+process-wide state: while a directory is built, it's in :data:`sys.path` and
+a finder of its modules is in :data:`sys.meta_path`, and while a target runs,
+:data:`sys.argv` and :data:`sys.stdout` are replaced. Other code (e.g. in other
+threads) should not run concurrently with a build.
+
+Usage::
+
+    python -m sublimedsl.build [--verify] [PATH...]
+"""
+
+import builtins
+import logging
+from argparse import ArgumentParser
+import os
+import runpy
+import sys
+from collections import OrderedDict, namedtuple
+from contextlib import redirect_stdout
+from fnmatch import fnmatch
+from importlib.machinery import PathFinder
+from importlib.util import resolve_name
+from io import StringIO
+from os import path
+from types import ModuleType
+
+from sublimedsl.fingerprint import content_digest
+from sublimedsl.keymap import Binding, Context, Keymap
+
+__all__ = ['TargetResult', 'build', 'find_sources', 'output_path']
+
+SOURCE_PATTERNS = ('*.sublime-keymap.py',)
+
+log = logging.getLogger(__name__)
+
+#: Result of building a target: the *source* path, paths of the modules from
+#: its directory that it depends on (*deps*), and the *error* raised by the
+#: source, or ``None``.
+TargetResult = namedtuple('TargetResult', ['source', 'deps', 'error'])
+
+
+def find_sources(paths, patterns=SOURCE_PATTERNS):
+    """ Find DSL sources in the given paths.
+
+    Arguments:
+        paths (Iterable[str]): Files and directories to search (recursively).
+        patterns (Iterable[str]): Shell-style patterns of the sources' file names.
+    Returns:
+        List[str]: Absolute paths of the found sources.
+    """
+    def matches(filename):
+        return any(fnmatch(filename, pattern) for pattern in patterns)
+
+    found = []
+    for top in paths:
+        if path.isfile(top):
+            found.append(path.abspath(top))
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            found.extend(path.abspath(path.join(dirpath, f))
+                         for f in sorted(filenames) if matches(f))
+    return found
+
+
+def output_path(source):
+    """ Return path of the file generated from the given DSL *source*. """
+    return source[:-3] if source.endswith('.py') else source + '.out'
+
+
+def build(sources, verify=False):
+    """ Execute the DSL *sources* in this process and write their outputs.
+
+    The modules imported from the sources' directories are (re)loaded from
+    scratch for each build, but only once within the build. An error in
+    a source is logged and returned in its result; the other sources are
+    built anyway.
+
+    Arguments:
+        sources (Iterable[str]): Paths of the DSL sources.
+        verify (bool): Whether to check that the sources don't modify the
+            bindings and keymaps of the shared fragments; it rehashes all the
+            fragments after each source.
+    Returns:
+        List[TargetResult]: The results in order of the *sources*.
+    """
+    roots = OrderedDict()
+    for source in sources:
+        roots.setdefault(path.dirname(path.abspath(source)), []).append(source)
+
+    results = {}
+    for root, group in roots.items():
+        with LocalImports(root, verify) as imports:
+            for source in group:
+                results[source] = _build_target(source, imports, verify)
+
+    return [results[source] for source in sources]
+
+
+def _build_target(source, imports, verify):
+    output, error = StringIO(), None
+    argv, sys.argv = sys.argv, [source]
+    imports.reset('__main__')
+    try:
+        with redirect_stdout(output):
+            module = runpy.run_path(source, imports.init_globals(), run_name='__main__')
+        imports.record_globals('__main__', module)
+    except SystemExit as e:
+        # sys.exit() with a zero or no status is a normal end of a script
+        if e.code not in (None, 0):
+            log.error('Failed to generate %s: exited with status %s', output_path(source), e.code)
+            error = e
+    except Exception as e:
+        log.exception('Failed to generate %s', output_path(source))
+        error = e
+    finally:
+        sys.argv = argv
+
+    if not error:
+        _write_if_changed(output_path(source), output.getvalue())
+        log.info('Generated %s', output_path(source))
+
+    if verify:
+        for name in imports.verify():
+            log.warning('%s has modified fragment %s; it will be evaluated again', source, name)
+
+    return TargetResult(source, imports.dependencies('__main__'), error)
+
+
+class LocalImports():
+
+    """ Context manager that tracks imports of the modules from the *root* directory.
+
+    On enter and exit, the modules from the directory are evicted from
+    :data:`sys.modules`, and the directory is added to :data:`sys.path`
+    while inside. The local modules are loaded by this object (as a
+    :data:`sys.meta_path` finder), which records the imports they execute.
+    If *verify* is true, the state of each local module (see
+    :func:`fragment_state`) is recorded right after it's loaded.
+    """
+
+    def __init__(self, root, verify=False):
+        self.root = root
+        self._verify = verify
+        self._imports = {}
+        self._states = {}
+        self._loading = []
+        self._builtins = dict(vars(builtins), __import__=self._record_import)
+
+    def __enter__(self):
+        _evict_local_modules(self.root)
+        sys.path.insert(0, self.root)
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.meta_path.remove(self)
+        sys.path.remove(self.root)
+        _evict_local_modules(self.root)
+
+    def init_globals(self):
+        """ Return globals for a script whose imports should be recorded. """
+        return {'__builtins__': self._builtins}
+
+    def record_globals(self, name, namespace):
+        """ Record the modules referenced from the *namespace* as imported by the module *name*.
+
+        This catches the modules imported by other means than the ``import``
+        statement, e.g. :func:`importlib.import_module`.
+        """
+        names = self._imports.setdefault(name, set())
+        names.update(value.__name__ for value in namespace.values()
+                     if isinstance(value, ModuleType))
+
+    def find_spec(self, name, path=None, target=None):
+        """ Find a local module; see :class:`importlib.abc.MetaPathFinder`. """
+        if name.partition('.')[0] == 'sublimedsl':
+            return None
+        spec = PathFinder.find_spec(name, path or [self.root], target)
+        if spec is None or not spec.has_location or not path_startswith(spec.origin, self.root):
+            return None
+        spec.loader = _RecordingLoader(spec.loader, self)
+        return spec
+
+    def reset(self, name):
+        """ Forget the imports recorded for the module *name*. """
+        self._imports.pop(name, None)
+
+    def dependencies(self, name):
+        """ Return paths of the local modules imported by the module *name*, transitively.
+
+        Returns:
+            Set[str]:
+        """
+        seen, stack = set(), [name]
+        while stack:
+            for imported in self._imports.get(stack.pop(), ()):
+                if imported not in seen:
+                    seen.add(imported)
+                    stack.append(imported)
+
+        return {module_file(sys.modules[n]) for n in seen
+                if n in sys.modules and is_local_module(sys.modules[n], self.root)}
+
+    def verify(self):
+        """ Find the local modules whose state has changed since they were imported.
+
+        The modified modules are evicted from :data:`sys.modules`, so they're
+        evaluated again when imported next time.
+
+        Returns:
+            List[str]: Names of the modified modules.
+        """
+        modified = [name for name, state in self._states.items()
+                    if name not in sys.modules or fragment_state(sys.modules[name]) != state]
+        for name in modified:
+            sys.modules.pop(name, None)
+            del self._states[name]
+            self._imports.pop(name, None)
+        return modified
+
+    def _record_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = builtins.__import__(name, globals, locals, fromlist, level)
+        importer = (globals or {}).get('__name__')
+        if importer:
+            if level:
+                name = resolve_name('.' * level + name, globals.get('__package__'))
+            names = self._imports.setdefault(importer, set())
+            names.add(name)
+            names.update('%s.%s' % (module.__name__, item) for item in fromlist or ())
+        return module
+
+    def _exec_module(self, loader, module):
+        name = module.__name__
+        if self._loading:
+            # imported by the module being loaded, e.g. via importlib.import_module
+            self._imports.setdefault(self._loading[-1], set()).add(name)
+
+        module.__builtins__ = self._builtins
+        self._loading.append(name)
+        try:
+            loader.exec_module(module)
+        finally:
+            self._loading.pop()
+
+        if self._verify:
+            self._states[name] = fragment_state(module)
+
+
+class _RecordingLoader():
+
+    """ Wrapper of a loader of the local modules; see :meth:`LocalImports.find_spec`. """
+
+    def __init__(self, loader, imports):
+        self._loader = loader
+        self._imports = imports
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._imports._exec_module(self._loader, module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+def fragment_state(module):
+    """ Return digests of the content of the module's bindings, contexts and keymaps.
+
+    The module-level variables that are DSL objects, or lists or tuples of
+    them, are considered. Unlike the objects' fingerprints, the digests are
+    not cached, so they reflect also in-place changes (e.g. of ``args``).
+
+    Returns:
+        Dict[str, List[bytes]]: Mapping of the variable names to the digests.
+    """
+    state = {}
+    for name, value in vars(module).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if values and all(isinstance(v, (Binding, Context, Keymap)) for v in values):
+            state[name] = [content_digest(_content(v)) for v in values]
+    return state
+
+
+def _content(obj):
+    if isinstance(obj, Keymap):
+        return [_content(binding) for binding in obj]
+    elif isinstance(obj, Binding):
+        return [obj.keys, obj.command, obj.args, [_content(ctx) for ctx in obj.context]]
+    return [obj.key, obj.operator, obj.operand, obj.match_all]
+
+
+def is_local_module(module, root):
+    if getattr(module, '__name__', '').partition('.')[0] == 'sublimedsl':
+        return False
+    return path_startswith(module_file(module), root)
+
+
+def path_startswith(filename, root):
+    return bool(filename) and path.abspath(filename).startswith(root + os.sep)
+
+
+def module_file(module):
+    filename = getattr(module, '__file__', None)
+    return path.abspath(filename) if filename else None
+
+
+def _evict_local_modules(root):
+    # only the modules loaded from the root, not others with the same name (e.g. stdlib's)
+    for name, module in list(sys.modules.items()):
+        if name != '__main__' and is_local_module(module, root):
+            del sys.modules[name]
+
+
+def _write_if_changed(filename, content):
+    if path.isfile(filename):
+        with open(filename, encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def main(argv=sys.argv[1:]):
+    parser = ArgumentParser(prog='python -m sublimedsl.build',
+                            description='Generate configs from their DSL sources.')
+    parser.add_argument('paths', metavar='PATH', nargs='*', default=['.'],
+                        help='DSL source or directory to search for the sources')
+    parser.add_argument('--verify', action='store_true',
+                        help="check that the sources don't modify the shared fragments")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    results = build(find_sources(args.paths), verify=args.verify)
+    sys.exit(1 if any(result.error for result in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
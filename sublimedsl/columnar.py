@@ -0,0 +1,213 @@
+"""
+Columnar storage backend for very large keymaps.
+
+:class:`ColumnarKeymap` behaves like :class:`~sublimedsl.keymap.Keymap`, but
+instead of keeping the bindings as Python objects, it stores their keys,
+commands, args and contexts in :mod:`array` columns of indexes into tables of
+interned (deduplicated) strings, args and contexts. Iterating over it creates
+:class:`~sublimedsl.keymap.Binding` and :class:`~sublimedsl.keymap.Context`
+views on the fly, so it serializes to exactly the same output.
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.columnar import ColumnarKeymap
+    from sublimedsl.keymap import *
+
+    ColumnarKeymap(
+        (bind('ctrl+%d' % (i % 10)).to('goto', line=i) for i in range(0, 1000000)),
+        common_context=[context('selector').equal('text.plain')]
+    ).dump()
+
+The bindings are read, not copied, so they can be produced by a generator
+and discarded right away. Modifying the views doesn't affect the keymap.
+"""
+
+import json
+from array import array
+from collections import OrderedDict
+from copy import deepcopy
+from funcy import flatten
+
+from sublimedsl.encoder import iterjsonify, write_json
+from sublimedsl.fingerprint import MerkleTree
+from sublimedsl.keymap import Binding, Context, Keymap, isnested
+
+__all__ = ['ColumnarKeymap']
+
+NONE = -1
+
+# mutable values that must be copied for each view
+CONTAINERS = (dict, list)
+
+
+class ColumnarKeymap(Keymap):
+
+    """ A keymap that stores the bindings in array-backed columns. """
+
+    def __init__(self, *bindings, default_match_all=None, common_context=[]):
+        """
+        Arguments:
+            *bindings (Binding): The key bindings to be added to this keymap.
+            default_match_all (Optional[bool]): See :class:`~sublimedsl.keymap.Keymap`.
+            common_context (List[Context]): See :class:`~sublimedsl.keymap.Keymap`.
+        """
+        self._default_match_all = default_match_all
+        self._common_context = common_context
+
+        self._strings = InternTable()
+        self._args_table = InternTable()
+        self._contexts_table = InternTable()
+
+        self._keys = array('i')
+        self._keys_ends = array('i')
+        self._commands = array('i')
+        self._args = array('i')
+        self._contexts = array('i')
+        self._contexts_ends = array('i')
+        self._merkle_tree = None
+
+        self._common, self._common_signatures = self._prepare_common_context(common_context)
+        self._common_ids = list(OrderedDict.fromkeys(map(self._intern_context, self._common)))
+        self.extend(*bindings)
+
+    def extend(self, *bindings):
+        """ Append the given bindings to this keymap.
+
+        Arguments:
+            *bindings (Binding): See :meth:`~sublimedsl.keymap.Keymap.extend`.
+        Returns:
+            ColumnarKeymap: self
+        """
+        intern_string = self._strings.intern
+        intern_args = self._args_table.intern
+
+        for binding in flatten(bindings, follow=isnested):
+            self._keys.extend(intern_string(key) for key in binding.keys)
+            self._keys_ends.append(len(self._keys))
+            self._commands.append(NONE if binding.command is None
+                                  else intern_string(binding.command))
+            self._args.append(intern_args(binding.args, _args_key(binding.args), deepcopy))
+            own = [self._intern_context(ctx) for ctx in binding.context]
+            common = self._common_ids
+            if own:
+                common = [idx for idx in common if idx not in own]
+            self._contexts.extend(own)
+            self._contexts.extend(common)
+            self._contexts_ends.append(len(self._contexts))
+
+        return self
+
+    def to_json(self, **kwargs):
+        """
+        Arguments:
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        Returns:
+            str: A JSON representing this keymap.
+        """
+        return ''.join(iterjsonify(self, **kwargs))
+
+    def dump(self, fp=None, **kwargs):
+        """ Serialize this keymap as a JSON formatted stream to the *fp*.
+
+        The bindings are encoded one by one, without materializing them all.
+
+        Arguments:
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        write_json(iterjsonify(self, **kwargs), fp)
+
+    def _intern_context(self, ctx):
+        match_all = self._default_match_all if ctx.match_all is None else ctx.match_all
+        values = (ctx.key, ctx.operator, ctx.operand, match_all)
+        return self._contexts_table.intern(values, json.dumps(values, default=repr), deepcopy)
+
+    def _make_context(self, idx):
+        ctx = Context.__new__(Context)
+        ctx.key, ctx.operator, operand, ctx.match_all = self._contexts_table.values[idx]
+        ctx.operand = deepcopy(operand) if isinstance(operand, CONTAINERS) else operand
+        ctx._parent = None
+        return ctx
+
+    def _update_merkle_tree(self):
+        # the stored bindings cannot be modified, so only the added ones are hashed
+        if self._merkle_tree is None:
+            self._merkle_tree = MerkleTree()
+        tree = self._merkle_tree
+        tree.extend(binding._digest() for binding in self._views(len(tree)))
+        return tree
+
+    def __iter__(self):
+        return self._views(0)
+
+    def _views(self, start):
+        """ Yield views of the bindings from the index *start*. """
+        strings = self._strings.values
+        args_table = self._args_table.values
+        contexts = {}
+
+        keys_start = self._keys_ends[start - 1] if start else 0
+        contexts_start = self._contexts_ends[start - 1] if start else 0
+        for i in range(start, len(self._commands)):
+            command = self._commands[i]
+            keys_end, contexts_end = self._keys_ends[i], self._contexts_ends[i]
+
+            context = []
+            for idx in self._contexts[contexts_start:contexts_end]:
+                if idx not in contexts:
+                    contexts[idx] = self._make_context(idx)
+                context.append(contexts[idx])
+
+            yield Binding._make(
+                tuple(strings[idx] for idx in self._keys[keys_start:keys_end]),
+                None if command == NONE else strings[command],
+                _copy_args(args_table[self._args[i]]),
+                context)
+
+            keys_start, contexts_start = keys_end, contexts_end
+
+    def __len__(self):
+        return len(self._commands)
+
+
+class InternTable():
+
+    """ A table of unique values, each identified by its index. """
+
+    def __init__(self):
+        self.values = []
+        self._ids = {}
+
+    def intern(self, value, key=None, copy=None):
+        """ Add the value into the table, unless it's already there.
+
+        Arguments:
+            value: The value to be added.
+            key: A hashable key that identifies the value (default is the value).
+            copy (Optional[Callable]): A function to copy the value with when
+                it's added, so the table doesn't share it with the caller.
+        Returns:
+            int: The value's index.
+        """
+        key = value if key is None else key
+        try:
+            return self._ids[key]
+        except KeyError:
+            self.values.append(value if copy is None else copy(value))
+            idx = self._ids[key] = len(self.values) - 1
+            return idx
+
+
+def _copy_args(args):
+    # deep copy only the args with nested containers, it's much slower
+    if any(isinstance(value, CONTAINERS) for value in args.values()):
+        return deepcopy(args)
+    return dict(args)
+
+
+def _args_key(args):
+    # JSON (unlike the dict's items) distinguishes e.g. 1, 1.0 and True
+    return json.dumps(args, sort_keys=True, default=repr) if args else ''
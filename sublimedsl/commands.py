@@ -0,0 +1,163 @@
+"""
+DSL for SublimeText's Command Palette definitions (``.sublime-commands``).
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.commands import *
+
+    Commands(
+        command('AsciiDoc: Toggle Bold')
+            .to('surround', chars='*'),
+
+        command('AsciiDoc: Preview')
+            .to('asciidoc_preview')
+
+    ).dump()  # nopep8
+
+The above code generates:
+
+..  code-block:: json
+
+    [{
+      "caption": "AsciiDoc: Toggle Bold",
+      "command": "surround",
+      "args": { "chars": "*" }
+    }, {
+      "caption": "AsciiDoc: Preview",
+      "command": "asciidoc_preview"
+    }]
+
+See `Command Palette <http://docs.sublimetext.info/en/latest/reference/command_palette.html>`_
+in the SublimeText documentation.
+"""
+
+from funcy import flatten, lflatten
+
+from sublimedsl.encoder import iterjsonify, jsonify, write_json
+from sublimedsl.keymap import isnested, public_attrs
+
+__all__ = ['Command', 'Commands', 'command']
+
+
+class Commands():
+
+    """ Basically a container for command palette items. """
+
+    def __init__(self, *commands):
+        """
+        Arguments:
+            *commands (Command): The commands to be added. Any (nested)
+                iterables of commands, e.g. lists, generators or other
+                :class:`Commands`, are flattened.
+        """
+        self._commands = lflatten(commands, follow=isnested)
+
+    @classmethod
+    def stream(cls, *commands, fp=None, **kwargs):
+        """ Serialize the given commands one by one to the *fp*.
+
+        Unlike :meth:`dump`, this doesn't build the container first, so the
+        commands may be produced lazily (e.g. by a generator).
+
+        Arguments:
+            *commands (Command): See :meth:`__init__`.
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        write_json(iterjsonify(flatten(commands, follow=isnested), **kwargs), fp)
+
+    def extend(self, *commands):
+        """ Append the given commands.
+
+        Arguments:
+            *commands (Command): See :meth:`__init__`.
+        Returns:
+            Commands: self
+        """
+        self._commands.extend(lflatten(commands, follow=isnested))
+        return self
+
+    def unlisted(self, keymap):
+        """ Find the key bindings whose command is not in these commands.
+
+        Arguments:
+            keymap (Iterable[Binding]): The keymap to check.
+        Returns:
+            List[Binding]: The bindings of commands that are not listed here.
+        """
+        listed = {cmd.command for cmd in self._commands}
+        return [binding for binding in keymap if binding.command not in listed]
+
+    def to_json(self, **kwargs):
+        """
+        Arguments:
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        Returns:
+            str: A JSON representing these commands.
+        """
+        return jsonify(self._commands, **kwargs)
+
+    def dump(self, fp=None, **kwargs):
+        """ Serialize these commands as a JSON formatted stream to the *fp*.
+
+        Arguments:
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        write_json(iterjsonify(self._commands, **kwargs), fp)
+
+    def __iter__(self):
+        return iter(self._commands)
+
+    def __lshift__(self, command):
+        self.extend([command])
+
+    def __len__(self):
+        return len(self._commands)
+
+    def __str__(self):
+        return self.to_json()
+
+
+class Command():
+
+    """ Represents a single item of the command palette. """
+
+    _JSON_ATTRS = ['caption', 'command', 'args']
+
+    def __init__(self, caption):
+        """
+        Arguments:
+            caption (str): The text shown in the command palette.
+        """
+        self.caption = caption
+        self.command = None
+        self.args = {}
+
+    def to(self, command, **args):
+        """ Specify the ST command to be run, with some *args*.
+
+        Arguments:
+            command (str): Name of the ST command (e.g. ``insert_snippet``).
+            **args: Arguments for the command.
+        Returns:
+            Command: self
+        """
+        self.command = command
+        self.args = args
+        return self
+
+    def __str__(self):
+        return jsonify(self)
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return public_attrs(self) == public_attrs(other)
+        return NotImplemented
+
+# alias
+command = Command
@@ -0,0 +1,168 @@
+"""
+Coverage of key chords by the bindings of a keymap, per scope selector.
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.coverage import CoverageMatrix
+
+    coverage = CoverageMatrix(keymap)
+    coverage.free('text.asciidoc markup.list', ['ctrl+b', 'ctrl+i', 'ctrl+k'])
+    coverage.contended(5)
+
+The matrix has a row for each key chord and a column for each scope selector
+used in the keymap's ``selector`` contexts, and it's stored as a bitset of the
+rows per column (Python ints). A binding occupies the first chord of its keys
+(i.e. also the prefix of a key sequence) in the column of its selector; when
+it has no ``selector`` context with the ``equal`` operator, it occupies the
+chord in all scopes. Other contexts are ignored, so a chord reported as free
+is not bound in the scope under any conditions.
+"""
+
+from collections import namedtuple
+from itertools import combinations
+from funcy import memoize
+
+from sublimedsl.keymap import MODIFIERS, normalize_key
+from sublimedsl.resolver import match_selector
+
+__all__ = ['Contention', 'CoverageMatrix', 'default_chords']
+
+#: A chord bound in *scopes* columns (counting the "all scopes" column) by
+#: *bindings* bindings.
+Contention = namedtuple('Contention', ['chord', 'scopes', 'bindings'])
+
+#: Modifiers combined in :func:`default_chords`.
+DEFAULT_MODIFIERS = ('ctrl', 'super', 'alt', 'shift')
+
+#: Keys combined in :func:`default_chords`.
+DEFAULT_KEYS = tuple('abcdefghijklmnopqrstuvwxyz0123456789,./;\'[]\\-=`') + (
+    'up', 'down', 'left', 'right', 'home', 'end', 'pageup', 'pagedown', 'insert',
+    'delete', 'backspace', 'tab', 'enter', 'escape', 'space',
+) + tuple('f%d' % i for i in range(1, 13))
+
+
+class CoverageMatrix():
+
+    """ A bitset matrix of the key chords against the scope selectors of a keymap. """
+
+    def __init__(self, keymap):
+        """
+        Arguments:
+            keymap (Iterable[Binding]): The keymap (or any iterable of bindings)
+                to analyze. Later changes of the keymap are not reflected.
+        Raises:
+            ValueError: If some binding has an invalid key.
+        """
+        self._chords = []
+        self._rows = {}
+        self._bindings = []
+        self._columns = {}
+        self._global = 0
+
+        for binding in keymap:
+            if not binding.keys:
+                continue
+            bit = 1 << self._row(normalize_key(binding.keys[0]))
+            selectors = _selectors(binding)
+            if selectors:
+                self._columns[selectors] = self._columns.get(selectors, 0) | bit
+            else:
+                self._global |= bit
+
+    def taken(self, scope=None):
+        """
+        Arguments:
+            scope (Optional[str]): The scope name, e.g. ``source.python string.quoted``,
+                or ``None`` for any scope.
+        Returns:
+            List[str]: The chords bound in the scope, in the keymap's order.
+        """
+        return self._decode(self._taken_mask(scope))
+
+    def free(self, scope=None, chords=None):
+        """ Find the chords that are not bound in the scope.
+
+        Arguments:
+            scope (Optional[str]): The scope name, e.g. ``source.python string.quoted``,
+                or ``None`` for the chords not bound in any scope.
+            chords (Optional[Iterable[str]]): The candidate chords; default is
+                :func:`default_chords`.
+        Returns:
+            List[str]: The free chords from the candidates (normalized, in
+            the candidates' order).
+        Raises:
+            ValueError: If some candidate chord is invalid.
+        """
+        taken = self._taken_mask(scope)
+        chords = default_chords() if chords is None else map(normalize_key, chords)
+        return [chord for chord in chords
+                if chord not in self._rows or not taken >> self._rows[chord] & 1]
+
+    def contended(self, count=None):
+        """ Find the chords bound in the most scopes.
+
+        Arguments:
+            count (Optional[int]): The maximum number of results.
+        Returns:
+            List[Contention]: The chords in descending order of the number of
+            scopes, then of the number of bindings.
+        """
+        scopes = [0] * len(self._chords)
+        for mask in [self._global] + list(self._columns.values()):
+            for idx in _bits(mask):
+                scopes[idx] += 1
+
+        result = sorted((Contention(chord, scopes[idx], self._bindings[idx])
+                         for idx, chord in enumerate(self._chords)),
+                        key=lambda c: (-c.scopes, -c.bindings))
+        return result[:count]
+
+    def _row(self, chord):
+        idx = self._rows.get(chord)
+        if idx is None:
+            idx = self._rows[chord] = len(self._chords)
+            self._chords.append(chord)
+            self._bindings.append(0)
+        self._bindings[idx] += 1
+        return idx
+
+    def _taken_mask(self, scope):
+        mask = self._global
+        for selectors, bits in self._columns.items():
+            if scope is None or all(match_selector(s, scope) for s in selectors):
+                mask |= bits
+        return mask
+
+    def _decode(self, mask):
+        return [self._chords[idx] for idx in _bits(mask)]
+
+
+@memoize
+def default_chords():
+    """ Return the chords of the common keys with any combination of :data:`DEFAULT_MODIFIERS`.
+
+    Returns:
+        Tuple[str]: The normalized chords.
+    """
+    modifiers = [mods for n in range(0, len(DEFAULT_MODIFIERS) + 1)
+                 for mods in combinations(DEFAULT_MODIFIERS, n)]
+    return tuple('+'.join([m for m in MODIFIERS if m in mods] + [key])
+                 for mods in modifiers for key in DEFAULT_KEYS)
+
+
+def _selectors(binding):
+    return tuple(sorted({ctx.operand for ctx in binding.context if _is_selector(ctx)}))
+
+
+def _is_selector(ctx):
+    """ Return ``True`` if the context matches a scope selector. """
+    if ctx.key != 'selector' or not isinstance(ctx.operand, str):
+        return False
+    return ctx.operator in (None, 'equal')
+
+
+def _bits(mask):
+    """ Return indexes of the set bits, in ascending order. """
+    return [idx for idx, bit in enumerate(reversed(bin(mask)[2:])) if bit == '1']
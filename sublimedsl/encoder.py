@@ -0,0 +1,350 @@
+"""
+JSON encoding of the DSL objects shared by all the config types.
+
+A DSL object declares the attributes to be serialized, in order, in the class
+attribute ``_JSON_ATTRS``. The attributes with ``None`` or empty values are
+omitted and dicts are sorted by keys.
+
+The encoding itself is done by a pluggable backend (see :class:`EncoderBackend`).
+The stdlib's :mod:`json` is always available; a faster backend using orjson is
+used by default when orjson is installed. All backends produce the same output.
+"""
+
+import json
+import re
+import sys
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from funcy import complement, first, select_values
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+__all__ = ['DSLJSONEncoder', 'EncoderBackend', 'jsonify', 'iterjsonify', 'iterjsonify_items',
+           'register_backend', 'use_backend', 'write_json']
+
+FILE_HEADER = '''\
+// This file is generated, do not edit it by hand!
+'''
+
+
+class DSLJSONEncoder(json.JSONEncoder):
+
+    def default(self, obj):
+        attrs = getattr(type(obj), '_JSON_ATTRS', None)
+        if attrs is None:
+            return super().default(obj)
+        return ordered_attrs(obj, attrs)
+
+
+def ordered_attrs(obj, attrs):
+    """ Return the object's attributes to be serialized, as an ordered dict.
+
+    The attributes with ``None`` value, or with an empty list or dict, are
+    omitted, and dict values are sorted by keys.
+    """
+    # This is the hot path of the encoding, so it's not composed from funcy.
+    result = OrderedDict()
+    for attr in attrs:
+        value = getattr(obj, attr)
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            if value:
+                result[attr] = sort_dict(value)
+        elif not isinstance(value, list) or value:
+            result[attr] = value
+    return result
+
+
+def isempty(obj):
+    return len(obj) == 0
+
+
+def remove_values(pred, col):
+    return select_values(complement(pred), col)
+
+
+def sort_dict(dic, key=lambda t: first(t)):
+    return OrderedDict(sorted(dic.items(), key=key))
+
+
+class Unsupported(Exception):
+    """ Raised by an encoder backend when it can't encode the object identically. """
+
+
+class EncoderBackend(metaclass=ABCMeta):
+
+    """ Interface of the JSON encoder backends used by :func:`jsonify`.
+
+    A backend must produce exactly the same output as the stdlib's :mod:`json`
+    (i.e. :class:`StdlibBackend`); for the inputs it can't encode identically,
+    it should return ``False`` from :meth:`supports` or raise :class:`Unsupported`
+    from :meth:`encode`, and :func:`jsonify` falls back to the stdlib.
+    """
+
+    #: Name of the backend, used in :func:`jsonify` and :func:`use_backend`.
+    name = None
+
+    @abstractmethod
+    def supports(self, indent, options):
+        """
+        Arguments:
+            indent (Optional[Union[int, str]]): The indentation.
+            options (dict): Other options for :func:`json.dumps`.
+        Returns:
+            bool: ``True`` if the backend can encode with these options.
+        """
+
+    @abstractmethod
+    def encode(self, obj, indent, **options):
+        """
+        Arguments:
+            obj: The object to encode; may contain DSL objects.
+            indent (Optional[Union[int, str]]): The indentation.
+            **options: Other options for :func:`json.dumps`.
+        Returns:
+            str: The JSON.
+        Raises:
+            Unsupported: If the backend can't encode the object identically.
+        """
+
+
+class StdlibBackend(EncoderBackend):
+
+    """ The reference backend using the stdlib's :mod:`json`. """
+
+    name = 'json'
+
+    def supports(self, indent, options):
+        return True
+
+    def encode(self, obj, indent, **options):
+        return json.dumps(obj, cls=DSLJSONEncoder, indent=indent, separators=(',', ': '),
+                          **options)
+
+
+class OrjsonBackend(EncoderBackend):
+
+    """ A backend using `orjson <https://github.com/ijl/orjson>`_.
+
+    It supports only the default options (indentation by 2 spaces) and falls
+    back for floats and integers out of the 64-bit range, which orjson
+    formats differently, and for any values other than the plain ones (see
+    :func:`check_plain`), which orjson may encode while :mod:`json` doesn't.
+    """
+
+    name = 'orjson'
+
+    def supports(self, indent, options):
+        return indent == 2 and not options
+
+    def encode(self, obj, indent, **options):
+        check_plain(obj)
+        try:
+            encoded = orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError as e:
+            raise Unsupported(obj) from e
+        return NON_ASCII_RE.sub(_escape_non_ascii, encoded.decode('utf-8'))
+
+
+def _orjson_default(obj):
+    attrs = getattr(type(obj), '_JSON_ATTRS', None)
+    if attrs is None:
+        raise TypeError
+    result = ordered_attrs(obj, attrs)
+    check_plain(result)
+    return result
+
+
+NON_ASCII_RE = re.compile('[\x7f-\U0010ffff]')
+
+
+def _escape_non_ascii(match):
+    code = ord(match.group(0))
+    if code > 0xffff:
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xd800 | (code >> 10), 0xdc00 | (code & 0x3ff))
+    return '\\u%04x' % code
+
+
+PLAIN_SCALARS = frozenset([str, int, bool, type(None)])
+
+
+def check_plain(obj):
+    """ Check that the object consists only of plain values or DSL objects.
+
+    The plain values are str, int, bool, None, dict, OrderedDict, list and
+    tuple (but not their subclasses); DSL objects are not descended into.
+
+    Raises:
+        Unsupported: If the object contains any other value (e.g. a float).
+    """
+    type_ = type(obj)
+    if type_ in PLAIN_SCALARS:
+        return
+    elif type_ is dict or type_ is OrderedDict:
+        for value in obj.values():
+            check_plain(value)
+    elif type_ is list or type_ is tuple:
+        for value in obj:
+            check_plain(value)
+    elif not hasattr(type_, '_JSON_ATTRS'):
+        raise Unsupported(obj)
+
+
+#: Registered backends by name, in order of preference.
+BACKENDS = OrderedDict()
+
+_default_backend = None
+
+
+def register_backend(backend, preferred=False):
+    """ Register the encoder backend.
+
+    Arguments:
+        backend (EncoderBackend): The backend to register.
+        preferred (bool): Whether to prefer it over the already registered backends.
+    """
+    BACKENDS[backend.name] = backend
+    if preferred:
+        BACKENDS.move_to_end(backend.name, last=False)
+
+
+def use_backend(name=None):
+    """ Set the default encoder backend.
+
+    Arguments:
+        name (Optional[str]): Name of the backend, or ``None`` to use the most
+            preferred one (the default).
+    Raises:
+        KeyError: If there's no such backend.
+    """
+    global _default_backend
+    _default_backend = BACKENDS[name] if name else None
+
+
+def get_backend(name=None):
+    """
+    Arguments:
+        name (Optional[str]): Name of the backend, or ``None`` for the default one.
+    Returns:
+        EncoderBackend:
+    Raises:
+        KeyError: If there's no such backend.
+    """
+    if name:
+        return BACKENDS[name]
+    return _default_backend or first(BACKENDS.values())
+
+
+def jsonify(obj, indent=2, backend=None, **kwargs):
+    """ Serialize the object with DSL objects to JSON.
+
+    Arguments:
+        obj: The object to serialize.
+        indent (Optional[Union[int, str]]): The indentation (see :func:`json.dumps`).
+        backend (Optional[str]): Name of the encoder backend to use (default is
+            set by :func:`use_backend`). The output is the same for all backends.
+        **kwargs: Other options to be passed into :func:`json.dumps`.
+    Returns:
+        str: The JSON.
+    """
+    encoder = get_backend(backend)
+    if encoder is not STDLIB_BACKEND and encoder.supports(indent, kwargs):
+        try:
+            return encoder.encode(obj, indent, **kwargs)
+        except Unsupported:
+            pass
+    return STDLIB_BACKEND.encode(obj, indent, **kwargs)
+
+
+STDLIB_BACKEND = StdlibBackend()
+
+if orjson:
+    register_backend(OrjsonBackend())
+register_backend(STDLIB_BACKEND)
+
+
+def iterjsonify(objs, indent=2, **kwargs):
+    """ Serialize the iterable as a JSON array, encoding one item at a time.
+
+    The concatenated chunks are the same as ``jsonify(list(objs), indent, **kwargs)``,
+    but *objs* is consumed lazily.
+
+    Returns:
+        Iterator[str]: Chunks of the JSON document.
+    """
+    encode_item, closing = array_item_encoder(indent, **kwargs)
+
+    opening = '['
+    for obj in objs:
+        yield opening + encode_item(obj)
+        opening = ','
+
+    yield '[]' if opening == '[' else closing
+
+
+def iterjsonify_items(items, indent=2, **kwargs):
+    """ Serialize the (key, value) pairs as a JSON object, encoding one pair at a time.
+
+    The concatenated chunks are the same as ``jsonify(OrderedDict(items), indent, **kwargs)``
+    (for unique keys), but *items* is consumed lazily.
+
+    Returns:
+        Iterator[str]: Chunks of the JSON document.
+    """
+    encode_item, closing = array_item_encoder(indent, **kwargs)
+
+    opening = '{'
+    for key, value in items:
+        yield opening + encode_item(value, key)
+        opening = ','
+
+    yield '{}' if opening == '{' else closing.replace(']', '}')
+
+
+def array_item_encoder(indent=2, **kwargs):
+    """ Return a function that encodes an item of a JSON array, and the array's closing.
+
+    The item is encoded including the leading newline and indentation, but
+    without the preceding ``[`` or ``,``. When the function is given also a
+    key, it encodes a member of a JSON object instead.
+
+    Returns:
+        Tuple[Callable[[object], str], str]:
+    """
+    if indent is None:
+        newline, pad = '', ''
+    else:
+        newline, pad = '\n', ' ' * indent if isinstance(indent, int) else indent
+    prefix, nested = newline + pad, '\n' + pad
+
+    def encode_item(obj, key=None):
+        encoded = jsonify(obj, indent, **kwargs).replace('\n', nested)
+        if key is not None:
+            return prefix + json.dumps(key, **_key_options(kwargs)) + ': ' + encoded
+        return prefix + encoded
+
+    return encode_item, newline + ']'
+
+
+def write_json(chunks, fp=None):
+    """ Write the file header and the JSON document chunks into the *fp*.
+
+    Arguments:
+        chunks (Iterable[str]): Chunks of the JSON document, e.g. from :func:`iterjsonify`.
+        fp: A ``.write()``-supporting file-like object to write the generated
+            JSON to (default is ``sys.stdout``).
+    """
+    fp = fp or sys.stdout
+    fp.write(FILE_HEADER)
+    for chunk in chunks:
+        fp.write(chunk)
+    fp.write('\n')
+
+
+def _key_options(kwargs):
+    return {'ensure_ascii': kwargs.get('ensure_ascii', True)}
@@ -0,0 +1,193 @@
+"""
+Stable content fingerprints of the DSL objects.
+
+A fingerprint is a digest of the object's content, not of its JSON output, so
+it can be computed (and compared) without encoding anything. It's stable
+across runs and processes, thus it can be stored e.g. by build caches.
+
+The fingerprint of a :class:`~sublimedsl.keymap.Keymap` is the root of a
+:class:`MerkleTree` of its bindings' fingerprints. The tree is updated
+incrementally, i.e. only the paths from the changed or added bindings to the
+root are rehashed, and it allows to find the changed bindings by descending
+only into the differing subtrees.
+"""
+
+import json
+from hashlib import sha256
+
+__all__ = ['MerkleTree', 'content_digest']
+
+DIGEST_SIZE = 16
+
+# prefixes to distinguish digests of the content and of the tree's nodes
+CONTENT_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+# reused, since json.dumps creates a new encoder for each call with options
+_encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'), default=repr)
+
+
+def content_digest(*values):
+    """ Return a digest of the given values.
+
+    The values are canonicalized as JSON with sorted keys, so e.g. equal dicts
+    have the same digest regardless of their order, while ``1``, ``1.0`` and
+    ``True`` have different digests. Values that are not JSON serializable
+    are represented by their ``repr``.
+
+    Returns:
+        bytes:
+    """
+    canonical = _encoder.encode(values)
+    return sha256(CONTENT_PREFIX + canonical.encode('utf-8')).digest()[:DIGEST_SIZE]
+
+
+def combine_digests(*digests):
+    """ Return a digest of the given digests (in order).
+
+    Returns:
+        bytes:
+    """
+    return sha256(NODE_PREFIX + b''.join(digests)).digest()[:DIGEST_SIZE]
+
+
+class MerkleTree():
+
+    """ A binary hash tree over a sequence of leaf digests.
+
+    The leaves are paired from the left; an odd node at the end of a level is
+    promoted to the next level as is. The tree is kept between updates, so
+    :meth:`update` rehashes only the nodes above the changed leaves.
+    """
+
+    def __init__(self, leaves=()):
+        """
+        Arguments:
+            leaves (Iterable[bytes]): The leaf digests.
+        """
+        self._levels = [[]]
+        self.update(leaves)
+
+    @property
+    def root(self):
+        """ bytes: Digest of the whole tree. """
+        top = self._levels[-1]
+        return top[0] if top else combine_digests()
+
+    def __len__(self):
+        return len(self._levels[0])
+
+    def update(self, leaves):
+        """ Replace the leaves and rehash the nodes above the changed ones.
+
+        Arguments:
+            leaves (Iterable[bytes]): The new leaf digests.
+        Returns:
+            int: Number of the changed (or added) leaves.
+        """
+        leaves = list(leaves)
+        old = self._levels[0]
+        dirty = {idx for idx, leaf in enumerate(leaves) if idx >= len(old) or old[idx] != leaf}
+        self._levels[0] = leaves
+        self._rehash(set(dirty), len(old))
+        return len(dirty)
+
+    def replace(self, leaves):
+        """ Replace the leaves at the given positions and rehash only the nodes above them.
+
+        Arguments:
+            leaves (Dict[int, bytes]): Mapping of indexes of the existing
+                leaves to the new leaf digests.
+        Returns:
+            int: Number of the changed leaves.
+        """
+        level = self._levels[0]
+        dirty = {idx for idx, leaf in leaves.items() if level[idx] != leaf}
+        for idx in dirty:
+            level[idx] = leaves[idx]
+        self._rehash(set(dirty), len(level))
+        return len(dirty)
+
+    def extend(self, leaves):
+        """ Append the leaves and hash only the nodes above them.
+
+        Arguments:
+            leaves (Iterable[bytes]): The leaf digests to be added.
+        Returns:
+            int: Number of the added leaves.
+        """
+        level = self._levels[0]
+        start = len(level)
+        level.extend(leaves)
+        self._rehash(set(range(start, len(level))), start)
+        return len(level) - start
+
+    def _rehash(self, dirty, old_size):
+        """ Rehash (in place) the nodes above the *dirty* leaves.
+
+        Arguments:
+            dirty (Set[int]): Indexes of the changed or added leaves.
+            old_size (int): Number of the leaves before the change.
+        """
+        levels = self._levels
+        height = 0
+        while len(levels[height]) > 1:
+            level = levels[height]
+            if len(level) < old_size:
+                dirty.add(len(level) - 1)  # the last node may become odd
+            dirty = {idx // 2 for idx in dirty}
+            height += 1
+            if height == len(levels):
+                levels.append([])
+
+            parents = levels[height]
+            old_size = len(parents)
+            size = (len(level) + 1) // 2
+            del parents[size:]
+            parents.extend([None] * (size - len(parents)))
+            for idx in dirty:
+                parents[idx] = self._node(level, idx)
+
+        del levels[height + 1:]
+
+    def diff(self, other):
+        """ Find the leaves that differ from the *other* tree's leaves at the same position.
+
+        Only the subtrees whose roots differ are descended into.
+
+        Arguments:
+            other (MerkleTree): The tree to compare with.
+        Returns:
+            List[int]: Sorted indexes of the leaves of this tree that differ,
+            or that are beyond the end of the *other* tree.
+        """
+        result = []
+        if len(self) == 0:
+            return result
+
+        stack = [(len(self._levels) - 1, 0)]
+        while stack:
+            height, idx = stack.pop()
+            if other._get(height, idx) == self._levels[height][idx]:
+                continue
+            if height == 0:
+                result.append(idx)
+                continue
+            below = self._levels[height - 1]
+            stack.extend((height - 1, child) for child in (2 * idx + 1, 2 * idx)
+                         if child < len(below))
+
+        return result
+
+    def _get(self, height, idx):
+        level = self._get_level(height)
+        return level[idx] if idx < len(level) else None
+
+    def _get_level(self, height):
+        return self._levels[height] if height < len(self._levels) else []
+
+    @staticmethod
+    def _node(level, idx):
+        if 2 * idx + 1 < len(level):
+            return combine_digests(level[2 * idx], level[2 * idx + 1])
+        return level[2 * idx]
@@ -52,19 +52,61 @@ See `Key Bindings <http://docs.sublimetext.info/en/latest/reference/key_bindings
 in the SublimeText documentation.
 """  # nopep8
 
-import json
 import sys
 from collections import OrderedDict
-from copy import deepcopy
-from funcy import all_fn, any_fn, complement, iffy, isa, isnone, partial
+from collections.abc import Iterable
+from copy import copy, deepcopy
+from itertools import chain, repeat, zip_longest
+from funcy import flatten, lflatten, map, memoize, partial, select_keys, select_values
 from funcy import rcompose as pipe
-from funcy import first, flatten, lflatten, map, pluck_attr, select_keys, select_values, walk_values
 
-__all__ = ['Context', 'Binding', 'Keymap', 'bind', 'context']
-
-FILE_HEADER = '''\
-// This file is generated, do not edit it by hand!
-'''
+from sublimedsl.encoder import FILE_HEADER, DSLJSONEncoder, array_item_encoder, iterjsonify, jsonify
+from sublimedsl.encoder import remove_values, write_json
+from sublimedsl.fingerprint import MerkleTree, content_digest
+
+__all__ = ['Context', 'Binding', 'Keymap', 'Param', 'Template',
+           'bind', 'bind_many', 'context', 'normalize_key', 'param', 'parse_key', 'template']
+
+#: Platforms with their own keymap files.
+PLATFORMS = ('Linux', 'OSX', 'Windows')
+
+#: Default path of the files written by :meth:`Keymap.dump_platforms`.
+PLATFORM_PATH = 'Default ({platform}).sublime-keymap'
+
+#: Modifiers in the canonical order.
+MODIFIERS = ('ctrl', 'super', 'primary', 'alt', 'altgr', 'shift')
+
+MODIFIER_ALIASES = {
+    'control': 'ctrl',
+    'cmd': 'super',
+    'command': 'super',
+    'win': 'super',
+    'windows': 'super',
+    'option': 'alt',
+    'opt': 'alt',
+}
+
+#: Names of the keys other than single characters.
+KEY_NAMES = frozenset([
+    'up', 'down', 'right', 'left', 'insert', 'home', 'end', 'pageup', 'pagedown',
+    'backspace', 'delete', 'tab', 'enter', 'pause', 'escape', 'space', 'clear',
+    'sysreq', 'break', 'context_menu', 'plus', 'minus', 'equals', '<character>',
+    'keypad_period', 'keypad_divide', 'keypad_multiply', 'keypad_minus',
+    'keypad_plus', 'keypad_enter',
+    'browser_back', 'browser_forward', 'browser_refresh', 'browser_stop',
+    'browser_search', 'browser_favorites', 'browser_home',
+] + ['keypad%d' % i for i in range(0, 10)] + ['f%d' % i for i in range(1, 21)])
+
+KEY_ALIASES = {
+    'esc': 'escape',
+    'return': 'enter',
+    'del': 'delete',
+    'ins': 'insert',
+    'pgup': 'pageup',
+    'pgdn': 'pagedown',
+    'pgdown': 'pagedown',
+    'menu': 'context_menu',
+}
 
 
 class Keymap():
@@ -75,14 +117,23 @@ class Keymap():
         """
         Arguments:
             *bindings (Binding): The key bindings to be added to this keymap.
+                Any (nested) iterables of bindings, e.g. lists, generators or
+                other keymaps, are flattened.
             default_match_all (Optional[bool]): The default value of ``match_all`` to be
                 set when context doesn't specify it. See :meth:`Context.any`
                 and :meth:`Context.all`.
             common_context (List[Context]): The context that should be added to all bindings.
+                A binding that already has some of these contexts (with the same
+                attributes) doesn't get it twice. The contexts are copied once
+                and the copies are shared by all the bindings.
         """
         self._default_match_all = default_match_all
         self._common_context = common_context
+        self._common, self._common_signatures = self._prepare_common_context(common_context)
         self._bindings = self._preprocess(bindings)
+        self._adopt(self._bindings, 0)
+        self._merkle_tree = None
+        self._dirty = set()
 
     def to_json(self, **kwargs):
         """
@@ -93,7 +144,7 @@ class Keymap():
         """
         return jsonify(self._bindings, **kwargs)
 
-    def dump(self, fp=sys.stdout, **kwargs):
+    def dump(self, fp=None, **kwargs):
         """ Serialize this keymap as a JSON formatted stream to the *fp*.
 
         Arguments:
@@ -101,38 +152,265 @@ class Keymap():
                 generated JSON to (default is ``sys.stdout``).
             **kwargs: Options to be passed into :func:`json.dumps`.
         """
+        fp = fp or sys.stdout
         fp.write(FILE_HEADER)
         fp.write(self.to_json(**kwargs))
         fp.write('\n')
 
+    @classmethod
+    def stream(cls, *bindings, fp=None, default_match_all=None, common_context=[], **kwargs):
+        """ Preprocess and serialize the given bindings one by one to the *fp*.
+
+        Unlike :meth:`dump`, this doesn't build a keymap first, so the bindings
+        may be produced lazily (e.g. by a generator) and they are never all in
+        memory at once. The output is the same as of :meth:`dump`.
+
+        Arguments:
+            *bindings (Binding): The key bindings to be written; see :meth:`__init__`.
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            default_match_all (Optional[bool]): See :meth:`__init__`.
+            common_context (List[Context]): See :meth:`__init__`.
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        keymap = cls(default_match_all=default_match_all, common_context=common_context)
+        write_json(iterjsonify(keymap._iter_preprocess(bindings), **kwargs), fp)
+
+    def dump_platforms(self, modifiers, fps=None, path=PLATFORM_PATH, **kwargs):
+        """ Serialize a variant of this keymap for each platform, all in one pass.
+
+        The platform's variant has the modifiers replaced according to the
+        platform's mapping. Bindings that are the same on all the platforms
+        (i.e. without any of the replaced modifiers) are encoded only once.
+
+        Example::
+            >>> keymap.dump_platforms({
+            ...     'Linux': {'super': 'ctrl'},
+            ...     'OSX': {},
+            ...     'Windows': {'super': 'ctrl'}
+            ... })
+
+        Arguments:
+            modifiers (Dict[str, Dict[str, str]]): Mapping of platform names (see
+                :data:`PLATFORMS`) to mappings of modifiers to be replaced; the
+                modifiers are normalized like in :func:`parse_key`.
+            fps (Optional[Dict[str, object]]): Mapping of platform names to
+                ``.write()``-supporting file-like objects to write to. If not
+                given, the files are opened according to the *path*.
+            path (str): Path of the file to write to, where ``{platform}`` is
+                replaced with the platform name.
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        Raises:
+            ValueError: If some platform, modifier or key is not valid, a key
+                chord would lose a modifier on some platform (e.g. ``ctrl+super+x``
+                with ``super`` replaced by ``ctrl``), or a remapped key chord
+                would collide with another binding with the same context.
+        """
+        mappings = _platform_mappings(modifiers)
+        variants = self._platform_variants(mappings)
+        if fps is not None:
+            return self._dump_platforms(mappings, variants, fps, **kwargs)
+
+        fps = {}
+        try:
+            for platform in mappings:
+                fps[platform] = open(path.format(platform=platform), 'w', encoding='utf-8')
+            self._dump_platforms(mappings, variants, fps, **kwargs)
+        finally:
+            for fp in fps.values():
+                fp.close()
+
+    def _platform_variants(self, mappings):
+        """ Remap the keys of the bindings affected by the *mappings*.
+
+        Returns:
+            Dict[int, List[Tuple[str]]]: Mapping of the indexes of the affected
+                bindings to their keys for each platform.
+        Raises:
+            ValueError: See :meth:`dump_platforms`.
+        """
+        remapped = set().union(*mappings.values())
+        variants = {}
+        shared = set()
+        platform_chords = [{} for _ in mappings]
+
+        def remap(key, mapping, platform):
+            mods, name = parse_key(key)
+            if mapping.keys().isdisjoint(mods):
+                return key
+            new_mods = {mapping.get(mod, mod) for mod in mods}
+            new_key = '+'.join([mod for mod in MODIFIERS if mod in new_mods] + [name])
+            if len(new_mods) < len(mods):
+                raise ValueError("Key '%s' collapses to '%s' on %s" % (key, new_key, platform))
+            return new_key
+
+        for idx, binding in enumerate(self):
+            keys = tuple(map(normalize_key, binding.keys))
+            context = tuple(map(context_signature, binding.context))
+            if remapped.isdisjoint(mod for key in keys for mod in parse_key(key)[0]):
+                shared.add((keys, context))
+                continue
+
+            variants[idx] = []
+            for chords, (platform, mapping) in zip(platform_chords, mappings.items()):
+                new_keys = tuple(remap(key, mapping, platform) for key in binding.keys)
+                variants[idx].append(new_keys)
+                new_keys = tuple(map(normalize_key, new_keys))
+                if new_keys != keys:
+                    chords.setdefault((new_keys, context), {})[keys] = binding.keys
+
+        for chords, platform in zip(platform_chords, mappings):
+            for (keys, context), origins in chords.items():
+                if len(origins) > 1 or (keys, context) in shared:
+                    raise ValueError("Keys %s collide with another binding on %s"
+                                     % (' '.join(next(iter(origins.values()))), platform))
+        return variants
+
+    def _dump_platforms(self, modifiers, variants, fps, **kwargs):
+        platforms = list(modifiers)
+        encode_item, closing = array_item_encoder(**kwargs)
+        openings = ['['] * len(platforms)
+
+        def write(idx, chunk):
+            fps[platforms[idx]].write(openings[idx] + chunk)
+            openings[idx] = ','
+
+        for fp in fps.values():
+            fp.write(FILE_HEADER)
+
+        for binding_idx, binding in enumerate(self):
+            if binding_idx not in variants:
+                chunk = encode_item(binding)
+                for idx in range(len(platforms)):
+                    write(idx, chunk)
+                continue
+
+            chunks = {}
+            for idx, keys in enumerate(variants[binding_idx]):
+                if keys not in chunks:
+                    variant = copy(binding)
+                    variant.keys = keys
+                    chunks[keys] = encode_item(variant)
+                write(idx, chunks[keys])
+
+        for idx, opening in enumerate(openings):
+            fps[platforms[idx]].write(('[]' if opening == '[' else closing) + '\n')
+
+    @property
+    def fingerprint(self):
+        """ str: A stable digest of the bindings' content (hex string).
+
+        It's the root of a Merkle tree of the bindings' fingerprints (see
+        :mod:`sublimedsl.fingerprint`), updated incrementally: the bindings
+        report their changes made by the DSL methods (e.g. :meth:`Binding.to`,
+        :meth:`Context.any`) to this keymap, so only the changed and added
+        bindings, and the nodes above them, are rehashed. Direct assignments
+        to the attributes of the bindings in this keymap are not tracked.
+        """
+        return self._update_merkle_tree().root.hex()
+
+    def changed(self, other):
+        """ Find the bindings that differ from the *other* keymap's bindings.
+
+        The bindings are compared by position, using the fingerprints, so
+        nothing is encoded and only the differing subtrees are inspected.
+
+        Arguments:
+            other (Keymap): The keymap to compare with.
+        Returns:
+            List[int]: Sorted indexes of the bindings of this keymap that
+            differ from the *other*'s binding at the same position, or that
+            are beyond the end of the *other* keymap.
+        """
+        return self._update_merkle_tree().diff(other._update_merkle_tree())
+
+    def _update_merkle_tree(self):
+        if self._merkle_tree is None:
+            self._merkle_tree = MerkleTree(binding._digest() for binding in self._bindings)
+        elif self._dirty:
+            bindings = self._bindings
+            self._merkle_tree.replace({idx: bindings[idx]._digest() for idx in self._dirty})
+        self._dirty = set()
+        return self._merkle_tree
+
+    def _binding_changed(self, idx):
+        """ Called by the binding at the index *idx* when it's modified by the DSL. """
+        if self._merkle_tree is not None:
+            self._dirty.add(idx)
+
+    def _context_changed(self, ctx):
+        """ Called by a context shared by several bindings when it's modified by the DSL. """
+        for idx, binding in enumerate(self._bindings):
+            if any(c is ctx for c in binding.context):
+                self._binding_changed(idx)
+
+    def _adopt(self, bindings, start):
+        """ Make the *bindings*, stored from the index *start*, report their changes. """
+        for idx, binding in enumerate(bindings, start):
+            binding._owner = self
+            binding._index = idx
+            for ctx in binding.context:
+                if ctx._parent is not binding:
+                    ctx._owner = self
+
     def extend(self, *bindings):
         """ Append the given bindings to this keymap.
 
         Arguments:
-            *bindings (Binding): Bindings to be added.
+            *bindings (Binding): Bindings to be added; the same as for :meth:`__init__`.
         Returns:
             Keymap: self
         """
-        self._bindings.extend(self._preprocess(bindings))
+        added = self._preprocess(bindings)
+        self._adopt(added, len(self._bindings))
+        self._bindings.extend(added)
+        if self._merkle_tree is not None:
+            self._merkle_tree.extend(binding._digest() for binding in added)
         return self
 
     def _preprocess(self, bindings):
         return pipe(
+            partial(lflatten, follow=isnested),
             deepcopy,
-            partial(lflatten, follow=isa(list, tuple, Keymap)),
-            self._apply_common_context,
-            self._apply_default_match_all
+            self._apply_contexts
         )(bindings)
 
-    def _apply_common_context(self, bindings):
-        for binding in bindings:
-            binding.context.extend(self._common_context)
-        return bindings
+    def _iter_preprocess(self, bindings):
+        for binding in flatten(bindings, follow=isnested):
+            yield self._preprocess((binding,))[0]
+
+    def _prepare_common_context(self, contexts):
+        common, signatures, seen = [], [], set()
+        for ctx in contexts:
+            ctx = copy(ctx)
+            ctx._parent = None
+            if ctx.match_all is None:
+                ctx.match_all = self._default_match_all
+            signature = context_signature(ctx)
+            if signature not in seen:
+                seen.add(signature)
+                common.append(ctx)
+                signatures.append(signature)
+        return common, signatures
+
+    def _apply_contexts(self, bindings):
+        """ Apply the default match_all and the common context in a single pass. """
+        default, common, signatures = self._default_match_all, self._common, self._common_signatures
 
-    def _apply_default_match_all(self, bindings):
-        for context in flatten(pluck_attr('context', bindings)):
-            if context.match_all is None:
-                context.match_all = self._default_match_all
+        for binding in bindings:
+            context = binding.context
+            if not context:
+                context.extend(common)
+                continue
+
+            if default is not None:
+                for ctx in context:
+                    if ctx.match_all is None:
+                        ctx.match_all = default
+            if common:
+                present = {context_signature(ctx) for ctx in context}
+                context.extend(ctx for ctx, signature in zip(common, signatures)
+                               if signature not in present)
         return bindings
 
     def __iter__(self):
@@ -157,6 +435,12 @@ class Binding():
     in the SublimeText documentation.
     """
 
+    _JSON_ATTRS = ['keys', 'command', 'args', 'context']
+
+    # the keymap that contains this binding, and the binding's index in it
+    _owner = None
+    _index = None
+
     def __init__(self, *keys):
         """
         Arguments:
@@ -168,6 +452,31 @@ class Binding():
         self.args = {}
         self.context = []
 
+    @classmethod
+    def _make(cls, keys, command, args, context):
+        """ Create a binding with the given attributes, bypassing the DSL. """
+        binding = cls.__new__(cls)
+        binding.keys = keys
+        binding.command = command
+        binding.args = args
+        binding.context = context
+        return binding
+
+    @property
+    def fingerprint(self):
+        """ str: A stable digest of the binding's content, including its contexts (hex string).
+
+        It's cached until the binding or any of its contexts is modified by
+        the DSL or an attribute assignment; in-place changes of the ``args``
+        dict are not tracked.
+        """
+        return self._digest().hex()
+
+    def _digest(self):
+        # the contexts are included by their attributes, so it's a single digest
+        contexts = (getattr(ctx, attr) for ctx in self.context for attr in Context._JSON_ATTRS)
+        return cached_digest(self, (self.keys, self.command, self.args) + tuple(contexts))
+
     def to(self, command, **args):
         """ Bind the keys to the specified *command* with some *args*.
 
@@ -179,6 +488,7 @@ class Binding():
         """
         self.command = command
         self.args = args
+        self._changed()
         return self
 
     def when(self, key):
@@ -191,12 +501,30 @@ class Binding():
         """
         ctx = Context(key, self)
         self.context.append(ctx)
+        self._changed()
         return ctx
 
     # aliases
     also = when
     and_ = when
 
+    def _changed(self):
+        if self._owner is not None:
+            self._owner._binding_changed(self._index)
+
+    def __getstate__(self):
+        # a copy doesn't belong to the keymap
+        return select_keys(lambda k: k not in ('_owner', '_index'), self.__dict__)
+
+    @property
+    def normalized_keys(self):
+        """ The keys in the canonical form; see :func:`normalize_key`.
+
+        Raises:
+            ValueError: If some key is not valid.
+        """
+        return tuple(map(normalize_key, self.keys))
+
     def __str__(self):
         return jsonify(self)
 
@@ -209,6 +537,50 @@ class Binding():
 bind = Binding
 
 
+def bind_many(keys, command, args=None, context=[]):
+    """ Create many bindings at once from column-oriented data.
+
+    This is a faster alternative to building a lot of regular bindings with
+    the fluent DSL in a loop. All the created bindings share the same
+    :class:`Context` objects, so the contexts are built only once.
+
+    Example::
+        >>> bind_many(['super+%d' % i for i in range(1, 10)], 'select_by_index',
+        ...           args=[{'index': i} for i in range(0, 9)],
+        ...           context=[context('setting.tabs').true()])
+
+    Arguments:
+        keys (Iterable[Union[str, Sequence[str]]]): Keys of each binding; either
+            a single key, or a sequence of keys.
+        command (Union[str, Iterable[str]]): Name of the ST command for all the
+            bindings, or names of the command for each binding.
+        args (Union[dict, Iterable[dict], None]): Arguments for the command
+            of all the bindings, or arguments for each binding.
+        context (List[Context]): The context shared by all the bindings.
+    Returns:
+        List[Binding]: The created bindings.
+    Raises:
+        ValueError: If the columns have different lengths.
+    """
+    keys = [(k,) if isinstance(k, str) else tuple(k) for k in keys]
+    commands = _column(command, str, len(keys), 'command')
+    args_col = _column(args or {}, dict, len(keys), 'args')
+    context = list(context)
+
+    make = Binding._make
+    return [make(k, cmd, dict(a), context[:])
+            for k, cmd, a in zip(keys, commands, args_col)]
+
+
+def _column(value, scalar_type, length, name):
+    if isinstance(value, scalar_type):
+        return repeat(value, length)
+    value = list(value)
+    if len(value) != length:
+        raise ValueError("Column '%s' has %d items, expected %d" % (name, len(value), length))
+    return value
+
+
 class Context():
 
     """ Represents a context's condition for a key binding.
@@ -251,11 +623,16 @@ class Context():
             (partial match).
     """
 
+    _JSON_ATTRS = ['key', 'operator', 'operand', 'match_all']
+
     _OPERATORS = [
         'equal', 'not_equal', 'regex_match', 'not_regex_match',
         'regex_contains', 'not_regex_contains'
     ]
 
+    # the keymap that contains this context, if it's shared by several bindings
+    _owner = None
+
     def __init__(self, key, parent=None):
         """
         Arguments:
@@ -277,6 +654,7 @@ class Context():
             Context: self (for chaining)
         """
         self.match_all = True
+        self._changed()
         return self
 
     def any(self):
@@ -288,6 +666,7 @@ class Context():
             Context: self (for chaining)
         """
         self.match_all = False
+        self._changed()
         return self
 
     def true(self):
@@ -307,13 +686,32 @@ class Context():
     def _operator(self, operator, operand):
         self.operator = operator
         self.operand = operand
+        self._changed()
         return self._parent or self
 
+    def _changed(self):
+        if isinstance(self._parent, Binding):
+            self._parent._changed()
+        if self._owner is not None:
+            self._owner._context_changed(self)
+
+    def __getstate__(self):
+        # a copy doesn't belong to the keymap
+        return select_keys(lambda k: k != '_owner', self.__dict__)
+
     def __getattr__(self, name):
         if name in self._OPERATORS:
             return partial(self._operator, name)
         raise AttributeError
 
+    @property
+    def fingerprint(self):
+        """ str: A stable digest of the context's content (hex string). """
+        return self._digest().hex()
+
+    def _digest(self):
+        return cached_digest(self, (self.key, self.operator, self.operand, self.match_all))
+
     def __str__(self):
         return jsonify(self, indent=None)
 
@@ -325,27 +723,250 @@ class Context():
 # alias
 context = Context
 
+# backward compatibility
+KeymapJSONEncoder = DSLJSONEncoder
+
 
-class KeymapJSONEncoder(json.JSONEncoder):
+class Param():
 
-    def default(self, obj):
-        ordered_attrs = pipe(
-            partial(map, lambda attr: (attr, getattr(obj, attr))),
-            partial(remove_values, isnone),
-            partial(remove_values, all_fn(isa(list, dict), isempty)),
-            partial(walk_values, iffy(isa(dict), sort_dict)),
-            OrderedDict)
+    """ A placeholder for a value in a :class:`Template`.
+
+    Examples::
+        >>> param('index')
+        >>> param('n', 'super+{}')
+    """
+
+    def __init__(self, name, format=None):
+        """
+        Arguments:
+            name (str): Name of the parameter.
+            format (Optional[str]): A format string (see :meth:`str.format`)
+                to interpolate the parameter's value into.
+        """
+        self.name = name
+        self.format = format
+
+    def resolve(self, params):
+        """
+        Arguments:
+            params (dict): Mapping of parameter names to values.
+        Returns:
+            The parameter's value, formatted if :attr:`format` is set.
+        Raises:
+            KeyError: If *params* doesn't contain this parameter.
+        """
+        value = params[self.name]
+        return self.format.format(value) if self.format else value
+
+# alias
+param = Param
 
-        if isinstance(obj, Context):
-            return ordered_attrs(['key', 'operator', 'operand', 'match_all'])
-        elif isinstance(obj, Binding):
-            return ordered_attrs(['keys', 'command', 'args', 'context'])
+
+class Template():
+
+    """ A key binding with placeholders that is expanded into concrete bindings.
+
+    The placeholders (:class:`Param`) may be used as keys, command, values of
+    args, and as key or operand of contexts. The template is analyzed once
+    when created; the parts without placeholders are then shared by all
+    the expanded bindings, including the :class:`Context` objects.
+
+    Example::
+        >>> tpl = template(bind(param('n', 'super+{}')).to('select_by_index', index=param('i')))
+        >>> Keymap(tpl.expand(n=range(1, 10), i=range(0, 9)))
+    """
+
+    def __init__(self, binding):
+        """
+        Arguments:
+            binding (Binding): The binding with placeholders. It's copied, so
+                later changes of the binding doesn't affect the template.
+        """
+        binding = deepcopy(binding)
+
+        self._keys = binding.keys
+        self._keys_have_params = any(map(isparam, binding.keys))
+        self._command = binding.command
+        self._static_args = remove_values(isparam, binding.args)
+        self._param_args = select_values(isparam, binding.args)
+
+        for ctx in binding.context:
+            ctx._parent = None
+        self._context = [(ctx, isparam(ctx.key) or isparam(ctx.operand))
+                         for ctx in binding.context]
+
+    def expand(self, *rows, **columns):
+        """ Expand this template into bindings for each set of parameters.
+
+        The bindings are created lazily, so this can be passed directly into
+        :class:`Keymap` or :meth:`Keymap.stream`.
+
+        Arguments:
+            *rows (dict): Sets of parameters, i.e. mappings of parameter
+                names to values.
+            **columns (Iterable): Values of the named parameter for each
+                binding; the columns are zipped together (after *rows*).
+        Returns:
+            Iterator[Binding]: The expanded bindings.
+        Raises:
+            ValueError: If the columns have different lengths.
+            KeyError: If a set of parameters lacks some placeholder's value.
+        """
+        if columns:
+            rows = chain(rows, _zip_columns(columns))
+
+        return map(self._expand, rows)
+
+    def _expand(self, params):
+        resolve = partial(resolve_param, params=params)
+
+        keys = tuple(map(resolve, self._keys)) if self._keys_have_params else self._keys
+        args = self._static_args.copy()
+        for name, value in self._param_args.items():
+            args[name] = value.resolve(params)
+
+        context = [self._expand_context(ctx, params) if has_params else ctx
+                   for ctx, has_params in self._context]
+
+        return Binding._make(keys, resolve(self._command), args, context)
+
+    def _expand_context(self, ctx, params):
+        result = Context(resolve_param(ctx.key, params))
+        result.operator = ctx.operator
+        result.operand = resolve_param(ctx.operand, params)
+        result.match_all = ctx.match_all
+        return result
+
+# alias
+template = Template
+
+
+def isparam(obj):
+    return isinstance(obj, Param)
+
+
+def resolve_param(value, params):
+    return value.resolve(params) if isinstance(value, Param) else value
+
+
+def _zip_columns(columns):
+    names = list(columns)
+    missing = object()
+
+    for values in zip_longest(*columns.values(), fillvalue=missing):
+        if any(value is missing for value in values):
+            raise ValueError('Columns %s have different lengths' % ', '.join(names))
+        yield dict(zip(names, values))
+
+
+@memoize
+def parse_key(key):
+    """ Parse a key chord into the modifiers and the key.
+
+    Aliases of the modifiers and keys are resolved and the modifiers are
+    deduplicated and sorted in the canonical order (see :data:`MODIFIERS`).
+    The results are memoized.
+
+    Examples::
+        >>> parse_key('shift+super+k')
+        (('super', 'shift'), 'k')
+
+        >>> parse_key('cmd++')
+        (('super',), '+')
+
+    Arguments:
+        key (str): The key chord, e.g. ``ctrl+shift+k``.
+    Returns:
+        Tuple[Tuple[str], str]: The modifiers and the key.
+    Raises:
+        ValueError: If the modifiers or the key are not valid.
+    """
+    if key.endswith('++') or key == '+':
+        mods, key = key[:-2], '+'
+    else:
+        mods, _, key = key.rpartition('+')
+
+    if len(key) != 1:
+        name = key.lower()
+        key = KEY_ALIASES.get(name, name)
+        if key not in KEY_NAMES:
+            raise ValueError("Unknown key '%s'" % key)
+
+    modifiers = {_normalize_modifier(mod) for mod in mods.split('+')} if mods else ()
+
+    return tuple(m for m in MODIFIERS if m in modifiers), key
+
+
+def _normalize_modifier(mod):
+    mod = mod.lower()
+    mod = MODIFIER_ALIASES.get(mod, mod)
+    if mod not in MODIFIERS:
+        raise ValueError("Unknown modifier '%s'" % mod)
+    return mod
+
+
+def _platform_mappings(modifiers):
+    """ Validate and normalize the modifiers mappings for :meth:`Keymap.dump_platforms`. """
+    mappings = OrderedDict()
+    for platform, mapping in modifiers.items():
+        if platform not in PLATFORMS:
+            expected = ', '.join(PLATFORMS)
+            raise ValueError("Unknown platform '%s', expected one of: %s" % (platform, expected))
+        mappings[platform] = {_normalize_modifier(k): _normalize_modifier(v)
+                              for k, v in mapping.items()}
+    return mappings
+
+
+@memoize
+def normalize_key(key):
+    """ Return the canonical form of the key chord; see :func:`parse_key`.
+
+    Examples::
+        >>> normalize_key('shift+super+k')
+        'super+shift+k'
+
+        >>> normalize_key('Option+Esc')
+        'alt+escape'
+    """
+    modifiers, key = parse_key(key)
+    return '+'.join(modifiers + (key,))
+
+
+def context_signature(ctx):
+    """ Return a hashable value that is equal for contexts with the same attributes.
+
+    Unlike the attributes' equality, it distinguishes e.g. operands ``1``,
+    ``1.0`` and ``True``, which are encoded differently.
+    """
+    signature = (ctx.key, ctx.operator, type(ctx.operand), ctx.operand, ctx.match_all)
+    try:
+        hash(signature)
+    except TypeError:
+        return jsonify(signature[:2] + signature[3:], indent=None, sort_keys=True, default=repr)
+    return signature
+
+
+def cached_digest(obj, values):
+    """ Return the content digest of the object's *values*, cached in the object.
+
+    The cache is valid as long as the object refers to the same values, i.e.
+    until some of its attributes is reassigned.
+    """
+    cached = obj.__dict__.get('_content_digest')
+    if cached is not None and len(cached[0]) == len(values):
+        for old, new in zip(cached[0], values):
+            if old is not new:
+                break
         else:
-            return super().default(obj)
+            return cached[1]
+
+    obj._content_digest = (values, content_digest(*values))
+    return obj._content_digest[1]
 
 
-def isempty(obj):
-    return len(obj) == 0
+def isnested(obj):
+    """ Return ``True`` if the object is an iterable of bindings to be flattened. """
+    return isinstance(obj, Iterable) and not isinstance(obj, (str, bytes, dict))
 
 
 def public_attrs(obj):
@@ -358,15 +979,3 @@ def public_attrs(obj):
         dict: Mapping of attributes to their values.
     """
     return select_keys(lambda k: not k.startswith('_'), obj.__dict__)
-
-
-def remove_values(pred, col):
-    return select_values(complement(pred), col)
-
-
-def sort_dict(dic, key=lambda t: first(t)):
-    return OrderedDict(sorted(dic.items(), key=key))
-
-
-def jsonify(obj, indent=2, **kwargs):
-    return json.dumps(obj, cls=KeymapJSONEncoder, indent=indent, separators=(',', ': '), **kwargs)
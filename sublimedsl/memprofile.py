@@ -0,0 +1,263 @@
+"""
+Memory footprint report for building and encoding keymaps.
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.keymap import *
+    from sublimedsl.memprofile import profile_keymap
+
+    def build():
+        return [bind('super+%d' % i).to('select_by_index', index=i) for i in range(0, 10)]
+
+    print(profile_keymap(build, common_context=[context('selector').equal('text')]))
+
+The report contains memory (bytes and blocks) allocated in each phase of the
+build, as traced by :mod:`tracemalloc`:
+
+construct
+    calling the *build* function, i.e. creating the bindings with the DSL;
+preprocess
+    creating the :class:`~sublimedsl.keymap.Keymap`, i.e. deep copying the
+    bindings and applying the common context and default ``match_all``;
+encode
+    serializing the keymap to JSON; the peak includes the encoder's
+    intermediate objects.
+
+Then counts of the objects in the resulting keymap by category and their sizes
+as traced by :mod:`tracemalloc`, and the cost of the ``common_context``, which
+is referenced from every binding (that doesn't have the context already) and
+repeated in its output.
+"""
+
+import struct
+import tracemalloc
+from collections import Counter, OrderedDict, namedtuple
+from copy import copy
+
+from sublimedsl.columnar import ColumnarKeymap
+from sublimedsl.encoder import iterjsonify
+from sublimedsl.keymap import Binding, Context, Keymap, context_signature
+
+__all__ = ['MemoryReport', 'profile_keymap', 'measure_keymap']
+
+#: Memory allocated by a phase; *allocated* is the net growth in bytes, *blocks*
+#: is the net growth in number of memory blocks and *peak* is the maximum growth
+#: during the phase in bytes, or ``None`` if it cannot be measured (see
+#: :func:`profile_keymap`).
+PhaseStats = namedtuple('PhaseStats', ['allocated', 'blocks', 'peak'])
+
+#: Number of objects and their total size in bytes.
+CategoryStats = namedtuple('CategoryStats', ['count', 'size'])
+
+#: The cost of the common context: number of the common *contexts*, number of
+#: *references* to them from the bindings, bytes of the list slots holding the
+#: references, and bytes of the output repeating them.
+CommonContextStats = namedtuple('CommonContextStats',
+                                ['contexts', 'references', 'slot_bytes', 'encoded_bytes'])
+
+POINTER_SIZE = struct.calcsize('P')
+
+
+class MemoryReport():
+
+    """ The result of :func:`profile_keymap`. """
+
+    def __init__(self, phases, categories, common_context):
+        """
+        Arguments:
+            phases (OrderedDict[str, PhaseStats]): Memory allocated in each phase.
+            categories (OrderedDict[str, CategoryStats]): Objects in the keymap.
+            common_context (CommonContextStats): Cost of the common context.
+        """
+        self.phases = phases
+        self.categories = categories
+        self.common_context = common_context
+
+    def __str__(self):
+        lines = ['%-16s %14s %14s %14s' % ('Phase', 'Allocated', 'Blocks', 'Peak')]
+        lines += ['%-16s %14d %14d %14s' % (name, s.allocated, s.blocks,
+                                            '-' if s.peak is None else s.peak)
+                  for name, s in self.phases.items()]
+        lines += ['', '%-16s %14s %14s' % ('Category', 'Objects', 'Bytes')]
+        lines += ['%-16s %14d %14d' % (name, s.count, s.size)
+                  for name, s in self.categories.items()]
+        lines += ['', 'Common context: %d contexts, %d references (%d bytes), %d bytes in output'
+                  % self.common_context]
+        return '\n'.join(lines)
+
+
+def profile_keymap(build, **options):
+    """ Build and encode a keymap under :mod:`tracemalloc` and report its memory footprint.
+
+    The peak of each phase is measured only if this function starts the
+    tracing itself and :func:`tracemalloc.reset_peak` is available (Python
+    3.9+), so the peak of a caller that is already tracing is not clobbered.
+
+    Arguments:
+        build (Callable): A function that returns the bindings; anything that
+            can be passed into :class:`~sublimedsl.keymap.Keymap`. If it returns
+            a keymap, then its preprocessing is included in the *construct* phase.
+        **options: Keyword arguments for :class:`~sublimedsl.keymap.Keymap`
+            (e.g. ``common_context``).
+    Returns:
+        MemoryReport:
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    reset_peak = started and hasattr(tracemalloc, 'reset_peak')
+    try:
+        phases = OrderedDict()
+        bindings = _trace(phases, 'construct', build, reset_peak)
+        keymap = _trace(phases, 'preprocess', lambda: Keymap(bindings, **options), reset_peak)
+        _trace(phases, 'encode', keymap.to_json, reset_peak)
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    return MemoryReport(phases, measure_keymap(keymap), measure_common_context(keymap))
+
+
+def measure_keymap(keymap):
+    """ Count the objects in the keymap by category and measure their sizes.
+
+    Each object is counted only once, in the category where it's first found.
+    The size of a category is the memory traced by :mod:`tracemalloc` while
+    allocating shallow replicas of its objects, i.e. it includes the allocator's
+    overhead and the instances' ``__dict__``, but not the objects referenced
+    from other categories.
+
+    Returns:
+        OrderedDict[str, CategoryStats]: Stats for categories ``Binding``,
+        ``Context``, ``keys``, ``args`` and ``context lists``.
+    """
+    categories = OrderedDict((name, []) for name in
+                             ['Binding', 'Context', 'keys', 'args', 'context lists'])
+    seen = set()
+
+    def add(category, *objs):
+        for obj in objs:
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                categories[category].append(obj)
+
+    for binding in keymap:
+        add('Binding', binding, binding.command)
+        add('keys', binding.keys, *binding.keys)
+        add('args', binding.args, *_walk_values(binding.args))
+        add('context lists', binding.context)
+        for ctx in binding.context:
+            add('Context', ctx, ctx.key, ctx.operator, ctx.operand)
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        return OrderedDict((name, CategoryStats(len(objs), _traced_size(objs)))
+                           for name, objs in categories.items())
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def measure_common_context(keymap):
+    """
+    Returns:
+        CommonContextStats: The cost of the keymap's common context.
+    """
+    common = keymap._common
+    if not common:
+        return CommonContextStats(0, 0, 0, 0)
+
+    def encoded_size(context):
+        binding = Binding('x')
+        binding.context = context
+        return sum(map(len, iterjsonify([binding])))
+
+    # the bindings that already have some common context don't get it again,
+    # and the output differs for bindings with and without own contexts
+    references, encoded_bytes = 0, 0
+    for (has_own, present), count in _common_usage(keymap).items():
+        own = [Context('x')] if has_own else []
+        added = encoded_size(own + [common[idx] for idx in present]) - encoded_size(own)
+        references += len(present) * count
+        encoded_bytes += count * added
+
+    return CommonContextStats(len(common), references, references * POINTER_SIZE, encoded_bytes)
+
+
+def _common_usage(keymap):
+    """ Count the bindings by whether they have own contexts and by indexes of the common
+    contexts they refer to. """
+    if isinstance(keymap, ColumnarKeymap):
+        # the views don't share the common contexts, and an own context equal
+        # to a common one is stored as the same entry, so it's counted as one
+        indexes = {context_signature(ctx): idx for idx, ctx in enumerate(keymap._common)}
+        key = context_signature
+    else:
+        indexes = {id(ctx): idx for idx, ctx in enumerate(keymap._common)}
+        key = id
+
+    usage = Counter()
+    for binding in keymap:
+        present = tuple(sorted(idx for idx in map(indexes.get, map(key, binding.context))
+                               if idx is not None))
+        usage[len(binding.context) > len(present), present] += 1
+    return usage
+
+
+def _trace(phases, name, func, reset_peak):
+    before = tracemalloc.take_snapshot()
+    if reset_peak:
+        tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+
+    allocated, blocks = _growth(before)
+    phases[name] = PhaseStats(allocated, blocks, max(peak - start, 0) if reset_peak else None)
+    return result
+
+
+def _traced_size(objs):
+    """ Return the bytes traced while allocating shallow replicas of the objects. """
+    replicas = [None] * len(objs)
+    before = tracemalloc.take_snapshot()
+    for idx, obj in enumerate(objs):
+        replicas[idx] = _replicate(obj)
+    return _growth(before)[0]
+
+
+def _replicate(obj):
+    if isinstance(obj, str):
+        # str() and copy() return the same string; one-char strings are cached
+        return ''.join(list(obj))
+    elif isinstance(obj, tuple):
+        return tuple(list(obj))
+    elif isinstance(obj, list):
+        return list(obj)
+    elif isinstance(obj, dict):
+        return dict(obj)
+    return copy(obj)
+
+
+def _growth(before):
+    """ Return the bytes and blocks allocated since the *before* snapshot. """
+    stats = tracemalloc.take_snapshot().compare_to(before, 'filename')
+    # exclude the memory allocated by the snapshots themselves
+    stats = [s for s in stats if s.traceback[0].filename != tracemalloc.__file__]
+    return sum(s.size_diff for s in stats), sum(s.count_diff for s in stats)
+
+
+def _walk_values(obj):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            yield key
+            yield value
+            yield from _walk_values(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield value
+            yield from _walk_values(value)
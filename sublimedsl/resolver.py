@@ -0,0 +1,200 @@
+"""
+Simulation of which key binding SublimeText fires for the given editor state.
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.keymap import *
+    from sublimedsl.resolver import Resolver
+
+    keymap = Keymap(
+        bind('tab').to('indent')
+            .when('selector').equal('text.asciidoc')
+            .also('preceding_text').regex_contains(r'^\\s*$'),
+        bind('tab').to('insert', characters='\\t')
+    )
+    resolver = Resolver(keymap)
+
+    resolver.resolve('tab', selections=[
+        {'selector': 'text.asciidoc markup.list', 'preceding_text': '  '}
+    ])  # => the binding with command 'insert'
+
+Just like SublimeText, the resolver tries the bindings for the pressed keys
+from the last one and returns the first whose contexts are all satisfied.
+
+The editor state consists of values of the context keys that are the same for
+the whole view (e.g. ``setting.auto_match_enabled``), and values for each
+selection (e.g. ``preceding_text``, ``selection_empty``). For the ``selector``
+key, the value is the scope name at the selection and the operand is matched
+as a scope selector (with the ``,``, ``|`` and `` - `` operators).
+A context whose key has no value in the state is not satisfied.
+"""
+
+import re
+from functools import lru_cache
+from funcy import memoize
+
+from sublimedsl.keymap import normalize_key
+
+__all__ = ['Resolver', 'compile_regex', 'match_selector']
+
+
+class Resolver():
+
+    """ Resolves which binding of a keymap fires for a key press. """
+
+    def __init__(self, keymap):
+        """
+        Arguments:
+            keymap (Iterable[Binding]): The keymap (or any iterable of bindings)
+                to resolve against. The bindings are indexed and their contexts
+                compiled once, so later changes of the keymap are not reflected.
+        Raises:
+            ValueError: If some binding has an invalid key.
+        """
+        self._index = {}
+        for binding in keymap:
+            checks = [compile_context(ctx) for ctx in binding.context]
+            self._index.setdefault(binding.normalized_keys, []).append((binding, checks))
+
+    def resolve(self, keys, state={}, selections=({},)):
+        """ Find the binding that fires for the given keys in the given editor state.
+
+        Arguments:
+            keys (Union[str, Sequence[str]]): The pressed key chord, or sequence
+                of key chords.
+            state (dict): Values of the context keys for the whole view.
+            selections (List[dict]): Values of the context keys for each
+                selection; they take precedence over *state*.
+        Returns:
+            Optional[Binding]: The binding that fires, or ``None``.
+        """
+        for binding, checks in reversed(self._candidates(keys)):
+            if all(check(state, selections) for check in checks):
+                return binding
+        return None
+
+    def candidates(self, keys):
+        """
+        Arguments:
+            keys (Union[str, Sequence[str]]): The key chord, or sequence of key chords.
+        Returns:
+            List[Binding]: All the bindings of the keys in the keymap's order.
+        """
+        return [binding for binding, _ in self._candidates(keys)]
+
+    def _candidates(self, keys):
+        if isinstance(keys, str):
+            keys = (keys,)
+        return self._index.get(tuple(map(normalize_key, keys)), [])
+
+
+def compile_context(ctx):
+    """ Compile the context into a predicate of ``(state, selections)``. """
+    key = ctx.key
+    match_all = bool(ctx.match_all)
+    test = compile_operator(ctx.operator or 'equal',
+                            True if ctx.operand is None else ctx.operand,
+                            selector=(key == 'selector'))
+    missing = object()
+
+    def check(state, selections):
+        default = state.get(key, missing)
+        for selection in selections:
+            value = selection.get(key, default)
+            result = value is not missing and test(value)
+            if result is not match_all:
+                return result
+        return match_all
+
+    return check
+
+
+def compile_operator(operator, operand, selector=False):
+    """ Compile the context's operator and operand into a predicate of the value. """
+    negate = operator.startswith('not_')
+    operator = operator[4:] if negate else operator
+
+    if operator == 'equal' and selector:
+        alternatives = _parse_selector(operand)
+
+        def test(value):
+            return _match_alternatives(alternatives, _split_scope(value))
+    elif operator == 'equal':
+        def test(value):
+            return value == operand
+    elif operator in ('regex_match', 'regex_contains'):
+        regex = compile_regex(operand, full=(operator == 'regex_match'))
+
+        def test(value):
+            return regex.search(str(value)) is not None
+    else:
+        raise ValueError("Unknown operator '%s'" % operator)
+
+    return (lambda value: not test(value)) if negate else test
+
+
+@lru_cache(maxsize=1024)
+def compile_regex(pattern, full=False):
+    """ Compile the regular expression; the results are cached in a bounded cache.
+
+    Arguments:
+        pattern (str): The regular expression.
+        full (bool): Whether the compiled pattern should match only the whole
+            string (used for ``regex_match``).
+    Returns:
+        The compiled pattern; use its ``search`` method.
+    Raises:
+        re.error: If the pattern is not valid.
+    """
+    return re.compile(r'\A(?:%s)\Z' % pattern if full else pattern)
+
+
+def match_selector(selector, scope):
+    """ Return ``True`` if the scope selector matches the scope name.
+
+    Examples::
+        >>> match_selector('text.html, source.js', 'text.html.basic meta.tag')
+        True
+
+        >>> match_selector('text.html - meta.tag', 'text.html.basic meta.tag')
+        False
+    """
+    return _match_alternatives(_parse_selector(selector), _split_scope(scope))
+
+
+def _match_alternatives(alternatives, scopes):
+    return any(all(_match_path(path, scopes) != exclude for path, exclude in alternative)
+               for alternative in alternatives)
+
+
+@lru_cache(maxsize=1024)
+def _split_scope(scope):
+    return tuple(scope.split())
+
+
+@memoize
+def _parse_selector(selector):
+    alternatives = []
+    for alternative in re.split(r'[,|]', selector):
+        include, *excludes = alternative.split(' - ')
+        paths = [(_parse_path(include), False)] + [(_parse_path(e), True) for e in excludes]
+        alternatives.append(paths)
+    return alternatives
+
+
+def _parse_path(path):
+    return [(atom, atom + '.') for atom in path.split()]
+
+
+def _match_path(path, scopes):
+    """ Match the space-separated selector atoms against the scope names in order. """
+    i = 0
+    for atom, prefix in path:
+        while i < len(scopes) and not (scopes[i] == atom or scopes[i].startswith(prefix)):
+            i += 1
+        if i == len(scopes):
+            return False
+        i += 1
+    return True
@@ -0,0 +1,157 @@
+"""
+DSL for SublimeText's Settings (``.sublime-settings``).
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.settings import *
+
+    Settings(
+        {'extensions': ['adoc', 'asciidoc']},
+        tab_size=2,
+        translate_tabs_to_spaces=True,
+        word_wrap=None
+
+    ).dump()  # nopep8
+
+The above code generates:
+
+..  code-block:: json
+
+    {
+      "extensions": [
+        "adoc",
+        "asciidoc"
+      ],
+      "tab_size": 2,
+      "translate_tabs_to_spaces": true
+    }
+
+The settings are written in the order they were set; settings with ``None``
+value are omitted.
+
+See `Settings <http://docs.sublimetext.info/en/latest/customization/settings.html>`_
+in the SublimeText documentation.
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from sublimedsl.encoder import iterjsonify_items, write_json
+
+__all__ = ['Settings']
+
+
+class Settings():
+
+    """ Basically an ordered mapping of setting names to values. """
+
+    def __init__(self, *mappings, **settings):
+        """
+        Arguments:
+            *mappings (Union[Mapping, Iterable[Tuple[str, object]]]): Settings
+                to be added; mappings or iterables of (name, value) pairs.
+            **settings: Settings to be added (after the *mappings*).
+        """
+        self._settings = OrderedDict()
+        self.update(*mappings, **settings)
+
+    @classmethod
+    def stream(cls, *mappings, fp=None, **kwargs):
+        """ Serialize the given settings one by one to the *fp*.
+
+        Unlike :meth:`dump`, this doesn't build the settings first, so the
+        (name, value) pairs may be produced lazily (e.g. by a generator).
+        The names are not deduplicated.
+
+        Arguments:
+            *mappings: See :meth:`__init__`.
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        write_json(iterjsonify_items(_omit_none(_iter_items(mappings)), **kwargs), fp)
+
+    def set(self, name, value):
+        """ Set the setting (or replace its value).
+
+        Arguments:
+            name (str): Name of the setting.
+            value: Value of the setting; ``None`` means that the setting is
+                omitted in the output.
+        Returns:
+            Settings: self
+        """
+        self._settings[name] = value
+        return self
+
+    def update(self, *mappings, **settings):
+        """ Set all the given settings.
+
+        Arguments:
+            *mappings: See :meth:`__init__`.
+            **settings: See :meth:`__init__`.
+        Returns:
+            Settings: self
+        """
+        for name, value in _iter_items(mappings + (settings,)):
+            self._settings[name] = value
+        return self
+
+    def to_json(self, **kwargs):
+        """
+        Arguments:
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        Returns:
+            str: A JSON representing these settings.
+        """
+        return ''.join(iterjsonify_items(_omit_none(self.items()), **kwargs))
+
+    def dump(self, fp=None, **kwargs):
+        """ Serialize these settings as a JSON formatted stream to the *fp*.
+
+        Arguments:
+            fp: A ``.write()``-supporting file-like object to write the
+                generated JSON to (default is ``sys.stdout``).
+            **kwargs: Options to be passed into :func:`json.dumps`.
+        """
+        write_json(iterjsonify_items(_omit_none(self.items()), **kwargs), fp)
+
+    def items(self):
+        """
+        Returns:
+            Iterable[Tuple[str, object]]: The (name, value) pairs.
+        """
+        return self._settings.items()
+
+    def __getitem__(self, name):
+        return self._settings[name]
+
+    def __contains__(self, name):
+        return name in self._settings
+
+    def __iter__(self):
+        return iter(self._settings)
+
+    def __len__(self):
+        return len(self._settings)
+
+    def __str__(self):
+        return self.to_json()
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return self._settings == other._settings
+        return NotImplemented
+
+
+def _iter_items(mappings):
+    for mapping in mappings:
+        if isinstance(mapping, (Mapping, Settings)):
+            mapping = mapping.items()
+        yield from mapping
+
+
+def _omit_none(items):
+    return ((name, value) for name, value in items if value is not None)
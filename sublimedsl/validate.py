@@ -0,0 +1,230 @@
+"""
+Validation of keymaps before they are loaded by SublimeText.
+
+Example:
+
+..  code-block:: python
+
+    from sublimedsl.validate import validate_regexes
+
+    for problem in validate_regexes(keymap):
+        print(problem.message, problem.binding, sep='\\n')
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+try:
+    from re import _compiler as sre_compile
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_compile
+    import sre_constants
+    import sre_parse
+
+from sublimedsl.resolver import compile_regex
+
+__all__ = ['RegexProblem', 'validate_regexes']
+
+REGEX_OPERATORS = frozenset([
+    'regex_match', 'not_regex_match', 'regex_contains', 'not_regex_contains'
+])
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+ZERO_WIDTH = (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT)
+
+# characters on which it's tested whether two atoms can match the same character
+SAMPLE_CHARS = [chr(code) for code in range(256)]
+
+# escapes, character classes and alternation bars in a pattern
+ALTERNATION_RE = re.compile(r'\\.|\[\^?\]?(?:\\.|[^\]\\])*\]|\|', re.DOTALL)
+
+#: A problem found in a regex operand of the *context* in the *binding*.
+RegexProblem = namedtuple('RegexProblem', ['binding', 'context', 'message'])
+
+
+def validate_regexes(keymap):
+    """ Check the regex operands of all the contexts in the keymap.
+
+    Each distinct pattern is checked only once; the results of the analysis
+    and the compiled patterns are kept in bounded caches, the latter shared
+    with :func:`~sublimedsl.resolver.compile_regex`. Patterns are reported
+    when they are not valid, or when they contain an unbounded quantifier
+    whose iterations can match the same text in many ways, like ``(a+)*``
+    or ``(a|aa)+``, which may lead to catastrophic backtracking.
+
+    The patterns are checked with Python's :mod:`re`, whose dialect differs
+    from the SublimeText's regex engine; e.g. ``\\h`` or named groups
+    ``(?<name>...)`` are reported as invalid, although SublimeText accepts
+    them.
+
+    Arguments:
+        keymap (Iterable[Binding]): The keymap (or any iterable of bindings).
+    Returns:
+        List[RegexProblem]: The found problems in the keymap's order.
+    """
+    problems = []
+
+    for binding in keymap:
+        for ctx in binding.context:
+            if ctx.operator not in REGEX_OPERATORS:
+                continue
+            message = check_regex(ctx.operand, full=ctx.operator.endswith('regex_match'))
+            if message:
+                problems.append(RegexProblem(binding, ctx, message))
+
+    return problems
+
+
+def check_regex(pattern, full=False):
+    """
+    Arguments:
+        pattern (str): The regular expression to check.
+        full (bool): Whether the pattern should match the whole string (for
+            ``regex_match``); see :func:`~sublimedsl.resolver.compile_regex`.
+    Returns:
+        Optional[str]: Description of the problem, or ``None`` if the pattern is fine.
+    """
+    if not isinstance(pattern, str):
+        return 'Regex operand must be a string, got %r' % (pattern,)
+    try:
+        compile_regex(pattern, full=full)
+    except re.error as e:
+        return "Invalid regex '%s' (in Python's re dialect): %s" % (pattern, e)
+    if _analyze(pattern):
+        return "Regex '%s' may backtrack catastrophically (ambiguous quantifier)" % pattern
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _analyze(pattern):
+    # the parser merges alternatives of single characters into a set (e.g.
+    # (\w|\d) into [\w\d]), so an empty lookahead is added after each bar
+    marked = ALTERNATION_RE.sub(lambda m: '|(?=)' if m.group() == '|' else m.group(), pattern)
+    return has_ambiguous_repeat(sre_parse.parse(marked))
+
+
+def has_ambiguous_repeat(parsed):
+    """ Return ``True`` if the parsed pattern contains an unbounded repeat with ambiguous body.
+
+    The body of a repeat is considered ambiguous when it consists of another
+    unbounded repeat and only parts that may match empty string (e.g.
+    ``(a+)+`` or ``(?:x|\\d+)*``), when it has a variable width, but it's
+    made of a single repeated atom (e.g. ``(a|aa)+`` or ``(a*a)+``), when
+    it has alternatives of single atoms that match the same character (e.g.
+    ``(\\w|\\d)+``), or when it contains an unbounded repeat of an atom and
+    another atom that match the same character (e.g. ``(.*,)*``). This is
+    a heuristic; e.g. ``((ab)*c)+`` is not reported, because each iteration
+    must end with ``c``.
+    """
+    state = getattr(parsed, 'state', None) or parsed.pattern
+    for op, av in parsed:
+        if op in REPEATS:
+            _, max_, body = av
+            if max_ == sre_constants.MAXREPEAT and _is_ambiguous(body, state):
+                return True
+            if has_ambiguous_repeat(body):
+                return True
+        elif any(has_ambiguous_repeat(sub) for sub in _subpatterns(op, av)):
+            return True
+    return False
+
+
+def _is_ambiguous(body, state):
+    items = [item for item in _unwrap(body) if item[0] not in ZERO_WIDTH]
+    alternatives = [items]
+    if len(items) == 1 and items[0][0] == sre_constants.BRANCH:
+        alternatives = [[item for item in _unwrap(alternative) if item[0] not in ZERO_WIDTH]
+                        for alternative in items[0][1][1]]
+        singles = [items[0] for items in alternatives if len(items) == 1 and _is_atom(items[0])]
+        if _any_overlap(singles, singles, state):
+            return True
+
+    for items in alternatives:
+        for idx, (op, av) in enumerate(items):
+            if op not in REPEATS or av[1] != sre_constants.MAXREPEAT:
+                continue
+            others = items[:idx] + items[idx + 1:]
+            if all(_is_nullable(item) for item in others):
+                return True
+            repeated = [item for item in av[2] if item[0] not in ZERO_WIDTH]
+            if len(repeated) == 1 and _is_atom(repeated[0]) \
+                    and _any_overlap(repeated, filter(_is_atom, others), state):
+                return True
+
+    min_, max_ = body.getwidth()
+    if min_ != max_:
+        atoms = list(_atoms(body))
+        return len(atoms) > 1 and all(atom == atoms[0] for atom in atoms)
+    return False
+
+
+def _is_atom(item):
+    """ Return ``True`` if the item matches exactly one character. """
+    op, _ = item
+    return op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY,
+                  sre_constants.IN, sre_constants.CATEGORY)
+
+
+def _any_overlap(atoms, others, state):
+    """ Return ``True`` if some of the *atoms* and a different one of the *others* can match
+    the same character (tested on :data:`SAMPLE_CHARS`). """
+    matched = [(atom, _matched_chars(atom, state)) for atom in atoms]
+    for other in others:
+        chars = _matched_chars(other, state)
+        if any(atom is not other and chars & atom_chars for atom, atom_chars in matched):
+            return True
+    return False
+
+
+def _matched_chars(atom, state):
+    regex = sre_compile.compile(sre_parse.SubPattern(state, [atom]))
+    return {char for char in SAMPLE_CHARS if regex.match(char)}
+
+
+def _unwrap(items):
+    """ Yield the items, replacing groups with their content. """
+    for op, av in items:
+        if op == sre_constants.SUBPATTERN:
+            yield from _unwrap(av[-1])
+        else:
+            yield op, av
+
+
+def _is_nullable(item):
+    """ Return ``True`` if the item may match empty string. """
+    op, av = item
+    if op in REPEATS:
+        return av[0] == 0 or all(map(_is_nullable, av[2]))
+    elif op == sre_constants.BRANCH:
+        return any(all(map(_is_nullable, alternative)) for alternative in av[1])
+    elif op == sre_constants.SUBPATTERN:
+        return all(map(_is_nullable, av[-1]))
+    return op in ZERO_WIDTH
+
+
+def _atoms(items):
+    """ Yield the items that match a character, in all the subpatterns. """
+    for op, av in items:
+        if op in REPEATS:
+            yield from _atoms(av[2])
+        elif op in (sre_constants.SUBPATTERN, sre_constants.BRANCH):
+            for sub in _subpatterns(op, av):
+                yield from _atoms(sub)
+        elif op not in ZERO_WIDTH:
+            yield op, av
+
+
+def _subpatterns(op, av):
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    elif op == sre_constants.BRANCH:
+        return av[1]
+    elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    elif op == sre_constants.GROUPREF_EXISTS:
+        return [sub for sub in av[1:] if sub]
+    return []
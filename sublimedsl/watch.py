@@ -0,0 +1,172 @@
+"""
+Watch mode that regenerates configs whenever their DSL sources change.
+
+A DSL source is a Python script named after the generated file with suffix
+``.py`` (e.g. ``Default.sublime-keymap.py``) that writes the config to stdout,
+typically using :meth:`Keymap.dump() <sublimedsl.keymap.Keymap.dump>`.
+The sources are executed in-process by :func:`sublimedsl.build.build` and
+their output is written next to them (e.g. to ``Default.sublime-keymap``).
+
+Besides the sources, all the modules they import from their directory
+(i.e. shared fragments) are watched too; when a fragment is changed, only
+the sources that depend on it are regenerated.
+
+Usage::
+
+    python -m sublimedsl.watch [PATH...]
+
+The changes are detected by polling modification times of the watched files,
+so it works everywhere without any additional dependencies.
+"""
+
+import logging
+import os
+import sys
+import time
+
+from sublimedsl.build import SOURCE_PATTERNS, build, find_sources, output_path
+
+__all__ = ['Watcher', 'compile_source', 'find_sources', 'output_path']
+
+log = logging.getLogger(__name__)
+
+
+def compile_source(source):
+    """ Execute the DSL *source* and write its output into :func:`output_path`.
+
+    The modules imported from the source's directory are (re)loaded from
+    scratch, so changes in them are always reflected.
+
+    Arguments:
+        source (str): Path of the DSL source.
+    Returns:
+        Set[str]: Paths of the modules from the source's directory that
+        the source has imported.
+    Raises:
+        Exception: The error raised by the source.
+    """
+    result, = build([source])
+    if result.error:
+        raise result.error
+    return result.deps
+
+
+class Watcher():
+
+    """ Watches DSL sources and their local imports and regenerates the outputs. """
+
+    def __init__(self, paths, interval=0.2, debounce=0.1, patterns=SOURCE_PATTERNS):
+        """
+        Arguments:
+            paths (List[str]): Files and directories with the DSL sources.
+            interval (float): Seconds between checks for changes.
+            debounce (float): Seconds to wait for more changes after a change
+                is detected, before the sources are regenerated.
+            patterns (Iterable[str]): See :func:`find_sources`.
+        """
+        self.paths = paths
+        self.interval = interval
+        self.debounce = debounce
+        self.patterns = patterns
+        self._deps = {}
+        self._mtimes = {}
+
+    def build_all(self):
+        """ Regenerate all the sources.
+
+        Returns:
+            List[str]: The regenerated sources.
+        """
+        self._deps = {}
+        self._scan()
+        sources = find_sources(self.paths, self.patterns)
+        self._build(sources)
+        return sources
+
+    def poll(self):
+        """ Check for changes and regenerate the affected sources.
+
+        When a change is detected, this waits until no more changes come in
+        for :attr:`debounce` seconds, so a burst of changes (e.g. saving
+        multiple files at once) triggers only one regeneration.
+
+        Returns:
+            List[str]: The regenerated sources.
+        """
+        changed = self._scan()
+        if not changed:
+            return []
+
+        while self.debounce:
+            time.sleep(self.debounce)
+            more = self._scan()
+            if not more:
+                break
+            changed |= more
+
+        def is_affected(source):
+            deps = self._deps.get(source)
+            return source in changed or deps is None or not changed.isdisjoint(deps)
+
+        affected = [s for s in find_sources(self.paths, self.patterns) if is_affected(s)]
+        self._build(affected)
+
+        return affected
+
+    def run(self):
+        """ Regenerate all the sources and then watch for changes until interrupted. """
+        self.build_all()
+        log.info('Watching for changes...')
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+    def _build(self, sources):
+        for result in build(sources):
+            deps = result.deps
+            if result.error:
+                deps |= self._deps.get(result.source, set())
+            self._deps[result.source] = deps
+
+        # record modification times only of the newly discovered dependencies;
+        # files changed during the build are left to be detected by next poll
+        for filename, mtime in self._stat(self._deps_files()).items():
+            self._mtimes.setdefault(filename, mtime)
+
+    def _scan(self):
+        """ Update the recorded modification times and return the changed files. """
+        files = set(find_sources(self.paths, self.patterns)) | self._deps_files()
+        mtimes = self._stat(files)
+
+        changed = {f for f in files if mtimes.get(f) != self._mtimes.get(f)}
+        self._mtimes = mtimes
+        for source in set(self._deps) - set(mtimes):
+            del self._deps[source]
+
+        return changed
+
+    def _deps_files(self):
+        return set().union(*self._deps.values())
+
+    @staticmethod
+    def _stat(files):
+        mtimes = {}
+        for filename in files:
+            try:
+                stat = os.stat(filename)
+                mtimes[filename] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        return mtimes
+
+
+def main(argv=sys.argv[1:]):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s', datefmt='%H:%M:%S')
+    Watcher(argv or ['.']).run()
+
+
+if __name__ == '__main__':
+    main()
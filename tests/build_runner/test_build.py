@@ -0,0 +1,204 @@
+import builtins
+import sys
+from types import ModuleType
+from sublimedsl import build as build_module
+from sublimedsl.build import LocalImports, build, fragment_state
+from sublimedsl.keymap import bind
+from pytest import fixture, raises
+
+
+SOURCE = '''\
+from sublimedsl.keymap import *
+from buildfrag_common import bindings, evaluated
+from {fragment} import extra
+
+Keymap(bindings, extra, common_context=[context('selector').equal({scope!r})]).dump()
+'''
+
+COMMON = '''\
+from sublimedsl.keymap import bind
+import buildfrag_counter
+buildfrag_counter.count += 1
+evaluated = buildfrag_counter.count
+bindings = [bind('x').to('common')]
+'''
+
+@fixture
+def tree(tmpdir):
+    tmpdir.join('buildfrag_counter.py').write('count = 0\n')
+    tmpdir.join('buildfrag_common.py').write(COMMON)
+    tmpdir.join('buildfrag_a.py').write(fragment('a'))
+    tmpdir.join('buildfrag_b.py').write(fragment('b'))
+    tmpdir.join('A.sublime-keymap.py').write(SOURCE.format(fragment='buildfrag_a', scope='text'))
+    tmpdir.join('B.sublime-keymap.py').write(SOURCE.format(fragment='buildfrag_b', scope='source'))
+    return tmpdir
+
+
+@fixture
+def sources(tree):
+    return [str(tree.join('A.sublime-keymap.py')), str(tree.join('B.sublime-keymap.py'))]
+
+
+def fragment(command):
+    return "from sublimedsl.keymap import bind\nextra = [bind('y').to(%r)]\n" % command
+
+
+def counter_source(name):
+    return SOURCE.format(fragment='buildfrag_a', scope='text') + \
+        'import buildfrag_counter\nopen(%r, "w").write(str(buildfrag_counter.count))\n' % name
+
+
+def describe_build():
+
+    def writes_outputs_of_isolated_targets(tree, sources):
+        build(sources)
+
+        a, b = tree.join('A.sublime-keymap').read(), tree.join('B.sublime-keymap').read()
+        assert '"command": "a"' in a and '"command": "b"' not in a
+        assert '"command": "b"' in b and '"command": "a"' not in b
+        assert '"operand": "text"' in a and '"operand": "source"' in b
+
+    def evaluates_shared_fragments_once(tree, sources):
+        tree.join('A.sublime-keymap.py').write(counter_source(str(tree.join('a.count'))))
+        tree.join('B.sublime-keymap.py').write(counter_source(str(tree.join('b.count'))))
+        build(sources)
+
+        assert tree.join('a.count').read() == '1'
+        assert tree.join('b.count').read() == '1'
+
+    def evaluates_fragments_again_in_next_build(tree, sources):
+        tree.join('A.sublime-keymap.py').write(counter_source(str(tree.join('a.count'))))
+        build(sources[:1])
+        build(sources[:1])
+
+        assert tree.join('a.count').read() == '1'
+        assert 'buildfrag_common' not in sys.modules
+
+    def returns_local_dependencies(tree, sources):
+        results = build(sources)
+
+        assert [r.source for r in results] == sources
+        common = ['buildfrag_common.py', 'buildfrag_counter.py']
+        assert results[0].deps == {str(tree.join(name)) for name in common + ['buildfrag_a.py']}
+        assert results[1].deps == {str(tree.join(name)) for name in common + ['buildfrag_b.py']}
+
+    def returns_dependencies_imported_by_importlib(tree, sources):
+        tree.join('A.sublime-keymap.py').write(
+            'import importlib\nfrag = importlib.import_module("buildfrag_a")\n')
+        results = build(sources)
+
+        assert results[0].deps == {str(tree.join('buildfrag_a.py'))}
+
+    def does_not_replace_builtin_import(tree, sources):
+        tree.join('A.sublime-keymap.py').write(
+            'import builtins\nbuiltins.seen_import = builtins.__import__\n')
+        try:
+            build(sources[:1])
+            assert builtins.seen_import is builtins.__import__
+        finally:
+            del builtins.seen_import
+
+    def continues_after_failed_target(tree, sources):
+        tree.join('A.sublime-keymap.py').write('raise ValueError("oops")')
+        results = build(sources)
+
+        assert isinstance(results[0].error, ValueError)
+        assert results[1].error is None
+        assert tree.join('B.sublime-keymap').check()
+
+    def continues_after_target_calling_sys_exit(tree, sources):
+        tree.join('A.sublime-keymap.py').write('import sys\nprint("[]")\nsys.exit(2)\n')
+        tree.join('B.sublime-keymap.py').write(
+            tree.join('B.sublime-keymap.py').read() + 'import sys\nsys.exit()\n')
+        results = build(sources)
+
+        assert isinstance(results[0].error, SystemExit)
+        assert not tree.join('A.sublime-keymap').check()
+        assert results[1].error is None
+        assert tree.join('B.sublime-keymap').check()
+
+    def evaluates_again_fragment_modified_by_target(tree, sources):
+        tree.join('A.sublime-keymap.py').write(
+            'from buildfrag_common import bindings\nbindings[0].to("modified")\n')
+        build(sources, verify=True)
+
+        assert '"command": "common"' in tree.join('B.sublime-keymap').read()
+
+    def evaluates_again_fragment_with_args_modified_in_place(tree, sources):
+        tree.join('buildfrag_common.py').write(COMMON.replace("to('common')", "to('common', a=1)"))
+        tree.join('A.sublime-keymap.py').write(
+            'from buildfrag_common import bindings\nbindings[0].args["a"] = 99\n')
+        build(sources, verify=True)
+
+        assert '"a": 1' in tree.join('B.sublime-keymap').read()
+
+    def does_not_verify_fragments_by_default(tree, sources, mocker):
+        spy = mocker.spy(build_module, 'fragment_state')
+        build(sources)
+
+        assert spy.call_count == 0
+
+    def does_not_evict_module_with_same_name_as_fragment(tree, sources):
+        tree.join('copy.py').write('raise ImportError("shadowed")\n')
+        stdlib_copy = sys.modules['copy']
+        results = build(sources)
+
+        assert [r.error for r in results] == [None, None]
+        assert sys.modules['copy'] is stdlib_copy
+
+
+def describe_LocalImports():
+
+    def verify_returns_modified_modules(tree):
+        with LocalImports(str(tree), verify=True) as imports:
+            import buildfrag_a
+            assert imports.verify() == []
+
+            buildfrag_a.extra.append(bind('z'))
+            assert imports.verify() == ['buildfrag_a']
+            assert 'buildfrag_a' not in sys.modules
+
+
+def describe_fragment_state():
+
+    def returns_digests_of_dsl_objects(tree):
+        with LocalImports(str(tree)):
+            import buildfrag_common
+            state = fragment_state(buildfrag_common)
+
+        assert list(state) == ['bindings']
+        assert state == fragment_state(module(bindings=[bind('x').to('common')]))
+
+    def reflects_in_place_changes():
+        binding = bind('x').to('fire', a=[1]).when('foo').equal([1])
+        subject = module(binding=binding, context=binding.context[0])
+        before = fragment_state(subject)
+
+        binding.args['a'].append(2)
+        assert fragment_state(subject)['binding'] != before['binding']
+        binding.context[0].operand.append(2)
+        assert fragment_state(subject)['context'] != before['context']
+
+
+def describe_main():
+
+    def builds_sources_in_paths(tree, sources, mocker):
+        spy = mocker.spy(build_module, 'build')
+        with raises(SystemExit) as excinfo:
+            build_module.main([str(tree)])
+
+        assert excinfo.value.code == 0
+        spy.assert_called_once_with(sources, verify=False)
+
+    def passes_verify_option(tree, sources, mocker):
+        spy = mocker.spy(build_module, 'build')
+        with raises(SystemExit):
+            build_module.main(['--verify', str(tree)])
+
+        spy.assert_called_once_with(sources, verify=True)
+
+
+def module(**attrs):
+    result = ModuleType('buildfrag_test')
+    vars(result).update(attrs)
+    return result
@@ -0,0 +1,153 @@
+import tracemalloc
+from io import StringIO
+from sublimedsl import keymap
+from sublimedsl.columnar import ColumnarKeymap, InternTable
+from sublimedsl.keymap import Binding, Context, Keymap, bind, context
+from pytest import fixture
+
+
+@fixture
+def bindings():
+    return [
+        bind('x', 'ctrl+y').to('fire', a=1, b=[1, 2])
+            .when('foo').any().true()
+            .also('bar').regex_match('a+'),
+        bind('z').to('fire', a=True),
+        bind('x').to('water', a=1.0).when('foo').any().true(),
+        bind('y'),
+    ]  # nopep8
+
+@fixture
+def options():
+    return dict(default_match_all=True, common_context=[context('selector').equal('text')])
+
+
+def describe_ColumnarKeymap():
+
+    def produces_same_json_as_Keymap(bindings, options):
+        expected = Keymap(bindings, **options).to_json()
+        assert ColumnarKeymap(bindings, **options).to_json() == expected
+
+        expected = Keymap(bindings).to_json(indent=None)
+        assert ColumnarKeymap(bindings).to_json(indent=None) == expected
+
+    def skips_common_contexts_already_present_like_Keymap(bindings):
+        options = dict(common_context=[context('foo').any().true(), context('baz').true(),
+                                       context('baz').true()])
+        expected = Keymap(bindings, **options).to_json()
+        assert ColumnarKeymap(bindings, **options).to_json() == expected
+
+    def dumps_same_output_as_Keymap(bindings, options):
+        expected, actual = StringIO(), StringIO()
+        Keymap(bindings, **options).dump(fp=expected)
+        ColumnarKeymap(bindings, **options).dump(fp=actual)
+        assert actual.getvalue() == expected.getvalue()
+
+    def streams_same_output_as_Keymap(bindings, options):
+        expected, actual = StringIO(), StringIO()
+        Keymap.stream(bindings, fp=expected, **options)
+        ColumnarKeymap.stream(bindings, fp=actual, **options)
+        assert actual.getvalue() == expected.getvalue()
+
+    def iterates_as_Binding_and_Context_views(bindings, options):
+        result = list(ColumnarKeymap(bindings, **options))
+
+        assert result == list(Keymap(bindings, **options))
+        assert all(isinstance(b, Binding) for b in result)
+        assert all(isinstance(c, Context) for b in result for c in b.context)
+
+    def does_not_modify_given_bindings(bindings, options):
+        ColumnarKeymap(bindings, **options)
+        assert [len(b.context) for b in bindings] == [2, 0, 1, 0]
+        assert options['common_context'][0].match_all is None
+
+    def is_not_affected_by_changes_of_views(bindings):
+        subject = ColumnarKeymap(bindings)
+        for binding in subject:
+            binding.args['a'] = 42
+            binding.context.clear()
+        assert list(subject) == list(Keymap(bindings))
+
+    def does_not_share_nested_args_and_operands(bindings):
+        expected = Keymap(bindings).to_json()
+        subject = ColumnarKeymap(bindings)
+
+        bindings[0].args['b'].append(3)
+        for binding in subject:
+            for value in binding.args.values():
+                if isinstance(value, list):
+                    value.append(4)
+        assert subject.to_json() == expected
+
+        operand = ['a', 'b']
+        subject = ColumnarKeymap(bind('x').to('fire').when('foo').any().equal(operand))
+        operand.append('c')
+        next(iter(subject)).context[0].operand.append('d')
+        assert next(iter(subject)).context[0].operand == ['a', 'b']
+
+    def has_same_fingerprint_as_Keymap(bindings, options):
+        subject = ColumnarKeymap(bindings, **options)
+        assert subject.fingerprint == Keymap(bindings, **options).fingerprint
+
+        subject.extend(bind('z').to('fire'))
+        assert subject.fingerprint == Keymap(bindings, bind('z').to('fire'), **options).fingerprint
+
+    def hashes_only_added_bindings(bindings, mocker):
+        subject = ColumnarKeymap(bindings)
+        subject.fingerprint
+        spy = mocker.spy(keymap, 'content_digest')
+
+        subject.fingerprint
+        assert spy.call_count == 0
+        subject.extend(bind('z').to('fire'))
+        subject.fingerprint
+        assert spy.call_count == 1
+
+    def accepts_generators_and_extend(bindings):
+        subject = ColumnarKeymap(b for b in bindings[:2])
+        subject.extend(bindings[2], [bindings[3]])
+        subject << bind('w')
+
+        assert len(subject) == 5
+        assert list(subject) == list(Keymap(bindings, bind('w')))
+
+    def interns_strings_args_and_contexts(bindings):
+        subject = ColumnarKeymap(bindings * 100)
+
+        assert len(subject) == 400
+        assert subject._strings.values == ['x', 'ctrl+y', 'fire', 'z', 'water', 'y']
+        assert len(subject._args_table.values) == 4
+        assert len(subject._contexts_table.values) == 2
+
+    def supports_dump_platforms(bindings):
+        fps = {'Linux': StringIO(), 'OSX': StringIO()}
+        ColumnarKeymap(bindings).dump_platforms({'Linux': {'ctrl': 'super'}, 'OSX': {}}, fps=fps)
+        assert '"super+y"' in fps['Linux'].getvalue()
+
+    def uses_less_memory_than_Keymap():
+        def generate():
+            return (bind('ctrl+%d' % (i % 10)).to('goto', line=i % 50).when('foo').true()
+                    for i in range(0, 2000))
+
+        assert measure(lambda: ColumnarKeymap(generate())) * 4 < measure(lambda: Keymap(generate()))
+
+
+def describe_InternTable():
+
+    def returns_same_index_for_same_key():
+        subject = InternTable()
+        assert subject.intern('a') == subject.intern('a') == 0
+        assert subject.intern('b') == 1
+        assert subject.intern([1], key='x') == subject.intern([1], key='x') == 2
+        assert subject.values == ['a', 'b', [1]]
+
+
+def measure(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+        del result
+        return size
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,66 @@
+from io import StringIO
+from sublimedsl.commands import Command, Commands, command
+from sublimedsl.encoder import FILE_HEADER
+from sublimedsl.keymap import Keymap, bind
+from textwrap import dedent
+from pytest import fixture
+
+
+@fixture
+def commands():
+    return [command('Bold').to('surround', chars='*'), command('Preview').to('preview')]
+
+
+def describe_Command():
+
+    def to_sets_command_and_args_and_returns_self():
+        subject = Command('Bold')
+        assert subject.to('surround', chars='*') is subject
+        assert subject.caption == 'Bold'
+        assert (subject.command, subject.args) == ('surround', {'chars': '*'})
+
+    def dumps_attrs_in_defined_order_and_omits_empty():
+        assert str(Command('Preview').to('preview', b=1, a=2)) == dedent('''\
+            {
+              "caption": "Preview",
+              "command": "preview",
+              "args": {
+                "a": 2,
+                "b": 1
+              }
+            }''')
+        assert '"args"' not in str(Command('Preview').to('preview'))
+
+    def eq_compares_attrs():
+        assert Command('x').to('a') == Command('x').to('a')
+        assert Command('x').to('a') != Command('x').to('b')
+
+    def test_command_is_alias_for_Command():
+        assert command is Command
+
+
+def describe_Commands():
+
+    def flattens_nested_iterables(commands):
+        subject = Commands(commands[0], (c for c in commands[1:]))
+        assert list(subject) == commands
+
+    def extend_appends_commands_and_returns_self(commands):
+        subject = Commands(commands[0])
+        assert subject.extend([commands[1]]) is subject
+        assert len(subject) == 2
+
+    def dump_writes_file_header_and_json(commands):
+        fp = StringIO()
+        Commands(commands).dump(fp=fp)
+        assert fp.getvalue() == FILE_HEADER + Commands(commands).to_json() + '\n'
+
+    def stream_writes_same_output_as_dump(commands):
+        expected, actual = StringIO(), StringIO()
+        Commands(commands).dump(fp=expected)
+        Commands.stream((c for c in commands), fp=actual)
+        assert actual.getvalue() == expected.getvalue()
+
+    def unlisted_returns_bindings_of_commands_not_in_palette(commands):
+        keymap = Keymap(bind('x').to('surround'), bind('y').to('other'), bind('z').to('preview'))
+        assert [b.keys for b in Commands(commands).unlisted(keymap)] == [('y',)]
@@ -0,0 +1,74 @@
+from sublimedsl.coverage import Contention, CoverageMatrix, default_chords
+from sublimedsl.keymap import Keymap, bind
+from pytest import fixture, raises
+
+
+@fixture
+def subject():
+    return CoverageMatrix(Keymap(
+        bind('ctrl+b').to('bold').when('selector').equal('text.asciidoc'),
+        bind('ctrl+b').to('build'),
+        bind('ctrl+i').to('italic').when('selector').equal('text.asciidoc, text.html'),
+        bind('ctrl+k', 'ctrl+u').to('upper_case'),
+        bind('Control+Shift+i').to('inspect').when('selector').equal('source.js'),
+        bind('alt+l').to('lint').when('selector').not_equal('text'),
+        bind('enter').to('continue_list')
+            .when('selector').equal('text.asciidoc')
+            .also('selector').equal('markup.list'),
+    ))  # nopep8
+
+
+def describe_taken():
+
+    def returns_chords_bound_in_scope(subject):
+        assert subject.taken('text.html.basic meta.tag') == ['ctrl+b', 'ctrl+i', 'ctrl+k', 'alt+l']
+
+    def requires_all_selectors_of_binding(subject):
+        assert 'enter' not in subject.taken('text.asciidoc')
+        assert 'enter' in subject.taken('text.asciidoc markup.list.unnumbered')
+
+    def returns_chords_bound_in_any_scope_for_none(subject):
+        assert subject.taken() == ['ctrl+b', 'ctrl+i', 'ctrl+k', 'ctrl+shift+i', 'alt+l', 'enter']
+
+
+def describe_free():
+
+    def returns_normalized_candidates_not_bound_in_scope(subject):
+        candidates = ['ctrl+b', 'ctrl+i', 'Control+Shift+i', 'ctrl+j', 'enter']
+        assert subject.free('source.js', candidates) == ['ctrl+i', 'ctrl+j', 'enter']
+        assert subject.free('text.asciidoc', candidates) == ['ctrl+shift+i', 'ctrl+j', 'enter']
+
+    def returns_candidates_not_bound_in_any_scope_for_none(subject):
+        assert subject.free(None, ['ctrl+b', 'ctrl+shift+i', 'ctrl+j']) == ['ctrl+j']
+
+    def uses_default_chords(subject):
+        result = subject.free('source.python')
+        assert 'ctrl+i' in result
+        assert 'ctrl+b' not in result
+        assert len(result) == len(default_chords()) - 3
+
+    def raises_ValueError_for_invalid_chord(subject):
+        with raises(ValueError):
+            subject.free('text', ['ctrl+nope'])
+
+
+def describe_contended():
+
+    def returns_chords_by_number_of_scopes_and_bindings(subject):
+        assert subject.contended(3) == [
+            Contention('ctrl+b', 2, 2),
+            Contention('ctrl+i', 1, 1),
+            Contention('ctrl+k', 1, 1),
+        ]
+
+    def returns_all_chords_by_default(subject):
+        assert len(subject.contended()) == 6
+
+
+def describe_default_chords():
+
+    def returns_normalized_chords():
+        result = default_chords()
+        assert 'ctrl+super+alt+shift+f12' in result
+        assert 'a' in result
+        assert len(result) == len(set(result))
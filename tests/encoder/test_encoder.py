@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from io import StringIO
+from sublimedsl import encoder
+from sublimedsl.commands import command
+from sublimedsl.encoder import BACKENDS, EncoderBackend, get_backend, jsonify, use_backend
+from sublimedsl.keymap import Keymap, bind, context
+from sublimedsl.settings import Settings
+from pytest import fixture, mark, raises
+
+
+CORPUS = [
+    [],
+    {},
+    Keymap(
+        bind('backspace')
+            .to('run_macro_file', file='res://Packages/Default/Delete Left Right.sublime-macro')
+            .when('setting.auto_match_enabled').any().true()
+            .also('preceding_text').regex_contains(r'_$')
+            .also('following_text').regex_contains(r'^_'),
+        bind('super+k', 'super+shift+up').to('new_pane', move=False),
+        common_context=[context('selector').equal('text.asciidoc')],
+        default_match_all=True)._bindings,  # nopep8
+    [bind('x').to('insert', characters='é \x7f\x1f\n\t"\\/\U0001f600')],
+    [bind('x').to('fire', z=1, a={'y': [1, {}], 'b': []}, m=None, n=2**70, o=-2**63)],
+    [bind('x').to('fire', ratio=1e16, half=0.5, nan=float('nan'))],
+    [bind('x').to('fire', nested={1: 'int key', 'a': 'b'})],
+    [command('Caption ü').to('fire', a=[(1, 2)])],
+    OrderedDict([('b', 1), ('a', [True, False, None])]),
+]
+
+
+@fixture(params=list(BACKENDS))
+def backend(request):
+    return request.param
+
+
+def describe_conformance():
+
+    @mark.parametrize('obj', CORPUS)
+    @mark.parametrize('options', [{}, {'indent': None}, {'indent': 4}, {'sort_keys': True}])
+    def backend_produces_same_output_as_stdlib(backend, obj, options):
+        try:
+            expected = jsonify(obj, backend='json', **options)
+        except TypeError:
+            with raises(TypeError):
+                jsonify(obj, backend=backend, **options)
+        else:
+            assert jsonify(obj, backend=backend, **options) == expected
+
+    def backend_produces_same_keymap_dump_as_stdlib(backend):
+        keymap = Keymap(bind('x').to('fire', b=1, a='é').when('foo').true(),
+                        common_context=[context('bar').false()])
+        expected, actual = StringIO(), StringIO()
+        keymap.dump(fp=expected, backend='json')
+        keymap.dump(fp=actual, backend=backend)
+
+        assert actual.getvalue() == expected.getvalue()
+
+    def backend_produces_same_settings_as_stdlib(backend):
+        settings = Settings(b=1, a={'z': [1, 2], 'y': 'é'})
+        assert settings.to_json(backend=backend) == settings.to_json(backend='json')
+
+
+def describe_jsonify():
+
+    def raises_TypeError_for_non_serializable_objects(backend):
+        with raises(TypeError):
+            jsonify([object()], backend=backend)
+
+    def falls_back_to_stdlib_when_backend_raises_Unsupported(mocker):
+        class Failing(EncoderBackend):
+            name = 'failing'
+
+            def supports(self, indent, options):
+                return True
+
+            def encode(self, obj, indent, **options):
+                raise encoder.Unsupported(obj)
+
+        mocker.patch.dict(BACKENDS, {'failing': Failing()})
+        assert jsonify([1], backend='failing') == jsonify([1], backend='json')
+
+
+def describe_EncoderBackend():
+
+    def cannot_be_instantiated_without_encode():
+        class Incomplete(EncoderBackend):
+            def supports(self, indent, options):
+                return True
+
+        with raises(TypeError):
+            Incomplete()
+
+
+def describe_use_backend():
+
+    def sets_default_backend():
+        try:
+            use_backend('json')
+            assert get_backend().name == 'json'
+        finally:
+            use_backend()
+
+    def raises_KeyError_for_unknown_backend():
+        with raises(KeyError):
+            use_backend('nope')
+
+
+def describe_register_backend():
+
+    def adds_backend_in_order_of_preference(mocker):
+        class Dummy(encoder.StdlibBackend):
+            name = 'dummy'
+
+        mocker.patch.object(encoder, 'BACKENDS', OrderedDict(BACKENDS))
+        encoder.register_backend(Dummy(), preferred=True)
+
+        assert list(encoder.BACKENDS)[0] == 'dummy'
+        assert get_backend().name == 'dummy'
@@ -0,0 +1,75 @@
+from pytest import mark
+from sublimedsl import fingerprint
+from sublimedsl.fingerprint import MerkleTree, content_digest
+
+
+def leaves(*values):
+    return [content_digest(value) for value in values]
+
+
+def describe_content_digest():
+
+    def ignores_order_of_dict_keys():
+        assert content_digest({'a': 1, 'b': 2}) == content_digest({'b': 2, 'a': 1})
+
+    def distinguishes_types_of_equal_values():
+        assert len({content_digest(1), content_digest(1.0), content_digest(True)}) == 3
+
+    def is_stable():
+        assert content_digest('x', None, {'a': [1]}).hex() == 'c37debd54bdda91012a47c904b0827dc'
+
+
+def describe_MerkleTree():
+
+    def has_same_root_when_updated_incrementally():
+        tree = MerkleTree(leaves(1, 2, 3))
+        tree.update(leaves(1, 9, 3, 4, 5))
+
+        assert tree.root == MerkleTree(leaves(1, 9, 3, 4, 5)).root
+        assert tree.root != MerkleTree(leaves(1, 2, 3, 4, 5)).root
+
+    def update_returns_number_of_changed_leaves():
+        tree = MerkleTree(leaves(1, 2, 3))
+        assert tree.update(leaves(1, 9, 3, 4)) == 2
+        assert tree.update(leaves(1, 9, 3, 4)) == 0
+
+    def extend_hashes_only_added_leaves(mocker):
+        tree = MerkleTree(leaves(*range(8)))
+        spy = mocker.spy(fingerprint, 'combine_digests')
+
+        assert tree.extend(leaves(8)) == 1
+        assert spy.call_count <= 4
+        assert tree.root == MerkleTree(leaves(*range(9))).root
+
+    def replace_hashes_only_nodes_above_replaced_leaves(mocker):
+        tree = MerkleTree(leaves(*range(9)))
+        spy = mocker.spy(fingerprint, 'combine_digests')
+
+        assert tree.replace({2: leaves('x')[0], 5: leaves(5)[0]}) == 1
+        assert spy.call_count <= 4
+        assert tree.root == MerkleTree(leaves(0, 1, 'x', 3, 4, 5, 6, 7, 8)).root
+
+    @mark.parametrize('old, new', [(0, 5), (5, 0), (7, 4), (4, 7), (8, 9), (9, 8), (1, 2)])
+    def has_same_root_when_resized(old, new):
+        tree = MerkleTree(leaves(*range(old)))
+        tree.update(leaves(*range(new)))
+        assert tree.root == MerkleTree(leaves(*range(new))).root
+
+    def has_root_of_empty_tree():
+        assert MerkleTree().root == MerkleTree([]).root
+        assert MerkleTree().root != MerkleTree(leaves(1)).root
+
+    def describe_diff():
+
+        def returns_indexes_of_differing_leaves():
+            tree = MerkleTree(leaves(*range(10)))
+            other = MerkleTree(leaves(0, 1, 2, 'x', 4, 5, 6, 7, 'y', 9))
+            assert tree.diff(other) == [3, 8]
+
+        def includes_leaves_beyond_end_of_other():
+            tree = MerkleTree(leaves(*range(7)))
+            assert tree.diff(MerkleTree(leaves(*range(5)))) == [5, 6]
+            assert MerkleTree(leaves(*range(5))).diff(tree) == []
+
+        def returns_empty_list_for_same_trees():
+            assert MerkleTree(leaves(*range(5))).diff(MerkleTree(leaves(*range(5)))) == []
@@ -0,0 +1,56 @@
+from sublimedsl.keymap import Binding, Keymap, bind, bind_many, context
+from pytest import raises
+
+
+def describe_bind_many():
+
+    def creates_binding_for_each_key():
+        result = bind_many(['x', 'y'], 'fire')
+        assert result == [bind('x').to('fire'), bind('y').to('fire')]
+
+    def accepts_sequences_of_keys():
+        result = bind_many([('x', 'y'), ['z']], 'fire')
+        assert [b.keys for b in result] == [('x', 'y'), ('z',)]
+
+    def accepts_command_per_binding():
+        result = bind_many(['x', 'y'], ['fire', 'water'])
+        assert [b.command for b in result] == ['fire', 'water']
+
+    def accepts_shared_args():
+        result = bind_many(['x', 'y'], 'fire', args={'a': 1})
+        assert [b.args for b in result] == [{'a': 1}, {'a': 1}]
+        assert result[0].args is not result[1].args
+
+    def accepts_args_per_binding():
+        result = bind_many(['x', 'y'], 'fire', args=[{'a': 1}, {'a': 2}])
+        assert [b.args for b in result] == [{'a': 1}, {'a': 2}]
+
+    def shares_context_objects_but_not_lists():
+        ctx = context('foo').true()
+        result = bind_many(['x', 'y'], 'fire', context=[ctx])
+
+        assert result[0].context == result[1].context == [ctx]
+        assert result[0].context[0] is result[1].context[0] is ctx
+        assert result[0].context is not result[1].context
+
+    def creates_same_bindings_as_fluent_dsl():
+        expected = [bind('x').to('fire', a=1).when('foo').true(),
+                    bind('y').to('fire', a=2).when('foo').true()]
+        result = bind_many(['x', 'y'], 'fire', args=[{'a': 1}, {'a': 2}],
+                           context=[context('foo').true()])
+        assert result == expected
+        assert all(isinstance(b, Binding) for b in result)
+
+    def raises_ValueError_when_columns_have_different_lengths():
+        with raises(ValueError):
+            bind_many(['x', 'y'], ['fire'])
+        with raises(ValueError):
+            bind_many(['x'], 'fire', args=[{}, {}])
+
+    def works_with_Keymap_common_context_and_default_match_all():
+        keymap = Keymap(bind_many(['x', 'y'], 'fire', context=[context('foo').true()]),
+                        common_context=[context('bar').false()],
+                        default_match_all=True)
+
+        assert [len(b.context) for b in keymap] == [2, 2]
+        assert all(c.match_all is True for b in keymap for c in b.context)
@@ -0,0 +1,148 @@
+from copy import deepcopy
+from sublimedsl import fingerprint, keymap
+from sublimedsl.keymap import Keymap, bind, context
+
+
+def binding():
+    return (bind('ctrl+x').to('fire', a=1)
+            .when('foo').any().true()
+            .also('bar').regex_match('a+'))
+
+
+def describe_Context():
+
+    def is_same_for_equal_contexts():
+        assert context('foo').all().true().fingerprint == context('foo').all().true().fingerprint
+
+    def changes_with_dsl_mutation():
+        ctx = context('foo').true()
+        before = ctx.fingerprint
+        assert ctx.all().fingerprint != before
+
+
+def describe_Binding():
+
+    def is_same_for_equal_bindings():
+        assert binding().fingerprint == binding().fingerprint
+        assert deepcopy(binding()).fingerprint == binding().fingerprint
+
+    def ignores_order_of_args():
+        assert bind('x').to('a', b=1, c=2).fingerprint == bind('x').to('a', c=2, b=1).fingerprint
+
+    def changes_with_dsl_mutations():
+        subject = binding()
+        seen = {subject.fingerprint}
+
+        subject.to('water')
+        seen.add(subject.fingerprint)
+        subject.when('baz').false()
+        seen.add(subject.fingerprint)
+        subject.context[0].all()
+        seen.add(subject.fingerprint)
+
+        assert len(seen) == 4
+
+    def changes_with_attribute_assignment():
+        subject = binding()
+        before = subject.fingerprint
+        subject.keys = ('ctrl+y',)
+        assert subject.fingerprint != before
+
+    def changes_with_shared_context():
+        ctx = context('foo').true()
+        subject = bind('x').to('fire')
+        subject.context = [ctx]
+        before = subject.fingerprint
+
+        ctx.any()
+        assert subject.fingerprint != before
+
+
+def describe_Keymap():
+
+    def is_same_for_equal_keymaps():
+        assert Keymap(binding(), bind('y')).fingerprint == Keymap(binding(), bind('y')).fingerprint
+
+    def depends_on_order_of_bindings():
+        assert Keymap(binding(), bind('y')).fingerprint != Keymap(bind('y'), binding()).fingerprint
+
+    def includes_common_context_and_default_match_all():
+        fingerprints = {
+            Keymap(binding()).fingerprint,
+            Keymap(binding(), default_match_all=True).fingerprint,
+            Keymap(binding(), common_context=[context('baz').true()]).fingerprint,
+        }
+        assert len(fingerprints) == 3
+
+    def is_updated_on_extend():
+        subject = Keymap(binding())
+        before = subject.fingerprint
+        subject.extend(bind('y'))
+
+        assert subject.fingerprint != before
+        assert subject.fingerprint == Keymap(binding(), bind('y')).fingerprint
+
+    def rehashes_only_added_and_modified_bindings(mocker):
+        subject = Keymap([bind('ctrl+%d' % i).to('fire', i=i) for i in range(10)])
+        subject.fingerprint
+        content = mocker.spy(keymap, 'content_digest')
+        combine = mocker.spy(fingerprint, 'combine_digests')
+
+        subject.fingerprint
+        assert (content.call_count, combine.call_count) == (0, 0)
+
+        subject.extend(bind('x'))
+        list(subject)[3].to('water')
+        subject.fingerprint
+        assert content.call_count == 2
+
+    def is_updated_on_mutation_of_binding():
+        subject = Keymap(binding(), bind('y'))
+        before = subject.fingerprint
+        list(subject)[1].to('water')
+
+        assert subject.fingerprint != before
+        assert subject.fingerprint == Keymap(binding(), bind('y').to('water')).fingerprint
+
+    def is_updated_on_mutation_of_context():
+        subject = Keymap(binding(), bind('y'))
+        before = subject.fingerprint
+        list(subject)[0].context[1].all()
+
+        expected = binding()
+        expected.context[1].all()
+        assert subject.fingerprint != before
+        assert subject.fingerprint == Keymap(expected, bind('y')).fingerprint
+
+    def is_updated_on_mutation_of_shared_context():
+        subject = Keymap(bind('x'), bind('y'), common_context=[context('foo').true()])
+        before = subject.fingerprint
+        list(subject)[1].context[0].any()
+
+        expected = Keymap(bind('x'), bind('y'), common_context=[context('foo').any().true()])
+        assert subject.fingerprint != before
+        assert subject.fingerprint == expected.fingerprint
+
+    def is_not_updated_on_mutation_of_copy():
+        subject = Keymap(binding(), bind('y'))
+        before = subject.fingerprint
+        copied = Keymap(subject)
+        list(copied)[1].to('water')
+        list(copied)[0].context[0].all()
+
+        assert subject.fingerprint == before
+        assert copied.fingerprint != before
+
+    def describe_changed():
+
+        def returns_indexes_of_changed_bindings():
+            original = Keymap([bind('ctrl+%d' % i).to('fire', i=i) for i in range(10)])
+            subject = Keymap(original)
+            list(subject)[2].to('water')
+            list(subject)[7].when('foo').true()
+            subject.extend(bind('x'))
+
+            assert subject.changed(original) == [2, 7, 10]
+
+        def returns_empty_list_for_equal_keymaps():
+            assert Keymap(binding()).changed(Keymap(binding())) == []
@@ -1,4 +1,5 @@
-from sublimedsl.keymap import Binding, Context, jsonify
+from sublimedsl.keymap import Binding, Context, iterjsonify, jsonify
+from pytest import mark
 from textwrap import dedent
 
 
@@ -68,3 +69,16 @@ def context_given_Binding():
     def omits_empty_lists():
         binding = Binding('x').to('new_pane')
         assert '"context"' not in jsonify(binding)
+
+
+def describe_iterjsonify():
+
+    @mark.parametrize('indent', [None, 0, 2, 4, '\t'])
+    def produces_same_output_as_jsonify_of_list(indent):
+        bindings = [Binding('x').to('new_pane', move=False).when('foo').any().true(),
+                    Binding('y', 'z').to('fire')]
+        expected = jsonify(bindings, indent=indent)
+        assert ''.join(iterjsonify(iter(bindings), indent=indent)) == expected
+
+    def produces_empty_array_for_empty_iterable():
+        assert ''.join(iterjsonify(iter([]))) == jsonify([])
@@ -1,7 +1,7 @@
 from io import StringIO
-from sublimedsl import keymap
+from sublimedsl import encoder, keymap
 from sublimedsl.keymap import Keymap, bind, context
-from pytest import fixture
+from pytest import fixture, mark, raises
 
 
 @fixture
@@ -39,6 +39,10 @@ def describe_preprocess():
         nested = [Keymap(bind('x'), Keymap(bind('y'))), bind('z')]
         assert subject._preprocess(nested) == bindings
 
+    def flattens_generators(subject, bindings):
+        nested = (b for b in [bind('x'), (bind(k) for k in 'yz')])
+        assert subject._preprocess(nested) == bindings
+
     def injects_common_context_to_bindings(binding1):
         bindings = [binding1, bind('x')]
         contexts = [context('abc').equal(42), context('def').any().equal(55)]
@@ -48,6 +52,45 @@ def describe_preprocess():
         assert result[0].context == binding1.context + contexts
         assert result[1].context == contexts
 
+    def describe_common_context():
+
+        def skips_contexts_already_present_in_binding():
+            binding = bind('x').when('abc').equal(42).also('def').true()
+            contexts = [context('def').true(), context('ghi').true()]
+
+            result = Keymap(common_context=contexts)._preprocess([binding])
+
+            assert [ctx.key for ctx in result[0].context] == ['abc', 'def', 'ghi']
+
+        def compares_contexts_after_applying_default_match_all():
+            binding = bind('x').when('abc').all().true().also('def').any().true()
+            contexts = [context('abc').true(), context('def').true()]
+
+            result = Keymap(common_context=contexts, default_match_all=True)._preprocess([binding])
+
+            assert [ctx.key for ctx in result[0].context] == ['abc', 'def', 'def']
+
+        def distinguishes_operands_of_different_types():
+            binding = bind('x').when('abc').equal(1).also('def').equal([1, 2])
+            contexts = [context('abc').equal(True), context('def').equal([1, 2])]
+
+            result = Keymap(common_context=contexts)._preprocess([binding])
+
+            assert [ctx.key for ctx in result[0].context] == ['abc', 'def', 'abc']
+
+        def deduplicates_common_context():
+            contexts = [context('abc').true(), context('abc').true()]
+            result = Keymap(common_context=contexts)._preprocess([bind('x')])
+            assert len(result[0].context) == 1
+
+        def shares_copies_of_common_contexts(bindings):
+            contexts = [context('abc').equal(42)]
+            result = Keymap(common_context=contexts, default_match_all=True)._preprocess(bindings)
+
+            assert all(b.context[0] is result[0].context[0] for b in result)
+            assert result[0].context[0] is not contexts[0]
+            assert contexts[0].match_all is None
+
     def context_default_match_all_is_None():
 
         def does_not_change_anything(binding1):
@@ -115,6 +158,27 @@ def describe_dump():
         assert fp.getvalue() == keymap.FILE_HEADER + '--json--' + '\n'
 
 
+def describe_stream():
+
+    def writes_same_output_as_dump(binding1):
+        options = dict(common_context=[context('abc').equal(42)], default_match_all=True)
+        expected, actual = StringIO(), StringIO()
+        Keymap(binding1, bind('x'), **options).dump(fp=expected)
+
+        Keymap.stream((b for b in [binding1, bind('x')]), fp=actual, **options)
+
+        assert actual.getvalue() == expected.getvalue()
+
+    def does_not_modify_given_bindings(binding1):
+        Keymap.stream(binding1, fp=StringIO(), common_context=[context('abc').equal(42)])
+        assert len(binding1.context) == 3
+
+    def writes_empty_array_when_no_bindings():
+        fp = StringIO()
+        Keymap.stream(iter([]), fp=fp)
+        assert fp.getvalue() == keymap.FILE_HEADER + '[]\n'
+
+
 def describe_iter():
 
     def iterates_over_bindings(bindings):
@@ -144,3 +208,116 @@ def describe_str():
     def delegates_to_to_json(subject, mocker):
         mocker.patch.object(Keymap, 'to_json', return_value='--json--')
         assert str(subject) == '--json--'
+
+
+def describe_dump_platforms():
+
+    @fixture
+    def modifiers():
+        return {'Linux': {'super': 'ctrl'}, 'OSX': {}, 'Windows': {'cmd': 'ctrl', 'alt': 'shift'}}
+
+    @fixture
+    def subject():
+        return Keymap(bind('super+k', 'shift+super+b').to('fire'),
+                      bind('ctrl+x').to('cut'),
+                      bind('alt+super+up').to('up'))
+
+    def writes_variant_with_remapped_modifiers_for_each_platform(subject, modifiers):
+        fps = {platform: StringIO() for platform in modifiers}
+        subject.dump_platforms(modifiers, fps=fps)
+
+        expected = {
+            'Linux': Keymap(bind('ctrl+k', 'ctrl+shift+b').to('fire'),
+                            bind('ctrl+x').to('cut'),
+                            bind('ctrl+alt+up').to('up')),
+            'OSX': subject,
+            'Windows': Keymap(bind('ctrl+k', 'ctrl+shift+b').to('fire'),
+                              bind('ctrl+x').to('cut'),
+                              bind('ctrl+shift+up').to('up')),
+        }
+        for platform, expected_keymap in expected.items():
+            expected_fp = StringIO()
+            expected_keymap.dump(fp=expected_fp)
+            assert fps[platform].getvalue() == expected_fp.getvalue()
+
+    def encodes_platform_independent_bindings_once(subject, modifiers, mocker):
+        spy = mocker.spy(encoder, 'jsonify')
+        subject.dump_platforms(modifiers, fps={p: StringIO() for p in modifiers})
+
+        # ctrl+x once, super+k once for OSX and once for both Linux and Windows,
+        # alt+super+up once for each platform
+        assert spy.call_count == 6
+
+    def normalizes_modifiers_in_mappings(subject):
+        fps = {'Linux': StringIO(), 'OSX': StringIO()}
+        subject.dump_platforms({'Linux': {'Super': 'Control'}, 'OSX': {'CMD': 'super'}}, fps=fps)
+
+        expected_fp = StringIO()
+        Keymap(bind('ctrl+k', 'ctrl+shift+b').to('fire'),
+               bind('ctrl+x').to('cut'),
+               bind('ctrl+alt+up').to('up')).dump(fp=expected_fp)
+        assert fps['Linux'].getvalue() == expected_fp.getvalue()
+        assert '"super+k"' in fps['OSX'].getvalue()
+
+    @mark.parametrize('modifiers', [
+        {'Linux': {'super': 'hyper'}},
+        {'Linux': {'meta': 'ctrl'}},
+        {'Linux': {}, 'Solaris': {}},
+    ])
+    def raises_ValueError_for_unknown_modifier_or_platform(subject, modifiers, tmpdir):
+        path = str(tmpdir.join('{platform}.sublime-keymap'))
+        with raises(ValueError):
+            subject.dump_platforms(modifiers, path=path)
+        assert tmpdir.listdir() == []
+
+    @mark.parametrize('bindings', [
+        [bind('ctrl+super+x').to('cut')],
+        [bind('super+k', 'shift+super+ctrl+k').to('fire')],
+    ])
+    def raises_ValueError_for_chord_losing_modifier(bindings, tmpdir):
+        path = str(tmpdir.join('{platform}.sublime-keymap'))
+        with raises(ValueError) as excinfo:
+            Keymap(*bindings).dump_platforms({'OSX': {}, 'Linux': {'super': 'ctrl'}}, path=path)
+        assert 'collapses to' in str(excinfo.value)
+        assert tmpdir.listdir() == []
+
+    @mark.parametrize('bindings', [
+        [bind('ctrl+x').to('cut'), bind('super+x').to('cut')],
+        [bind('super+x').to('cut'), bind('Control+x').to('cut')],
+        [bind('super+x').to('cut'), bind('ctrl+alt+x').to('x'), bind('alt+super+x').to('y')],
+        [bind('super+x').to('cut').when('a').true(), bind('ctrl+x').to('x').when('a').true()],
+    ])
+    def raises_ValueError_for_colliding_chords(bindings, tmpdir):
+        path = str(tmpdir.join('{platform}.sublime-keymap'))
+        with raises(ValueError) as excinfo:
+            Keymap(*bindings).dump_platforms({'OSX': {}, 'Linux': {'super': 'ctrl'}}, path=path)
+        assert 'collide with another binding on Linux' in str(excinfo.value)
+        assert tmpdir.listdir() == []
+
+    @mark.parametrize('bindings', [
+        [bind('ctrl+x').to('cut'), bind('super+x').to('cut').when('a').true()],
+        [bind('super+x').to('cut'), bind('alt+x').to('cut')],
+        [bind('super+x').to('cut'), bind('cmd+x').to('cut')],
+    ])
+    def allows_remapped_chords_in_different_context(bindings):
+        fps = {'OSX': StringIO(), 'Linux': StringIO()}
+        Keymap(*bindings).dump_platforms({'OSX': {}, 'Linux': {'super': 'ctrl'}}, fps=fps)
+
+    def raises_ValueError_for_invalid_key(tmpdir):
+        path = str(tmpdir.join('{platform}.sublime-keymap'))
+        subject = Keymap(bind('super+bogus').to('x'))
+        with raises(ValueError):
+            subject.dump_platforms({'Linux': {'super': 'ctrl'}}, path=path)
+        assert tmpdir.listdir() == []
+
+    def writes_empty_arrays_for_empty_keymap(modifiers):
+        fps = {platform: StringIO() for platform in modifiers}
+        Keymap().dump_platforms(modifiers, fps=fps)
+        assert all(fp.getvalue() == keymap.FILE_HEADER + '[]\n' for fp in fps.values())
+
+    def writes_files_according_to_path(subject, tmpdir):
+        path = str(tmpdir.join('Default ({platform}).sublime-keymap'))
+        subject.dump_platforms({'Linux': {'super': 'ctrl'}, 'OSX': {}}, path=path)
+
+        assert '"ctrl+k"' in tmpdir.join('Default (Linux).sublime-keymap').read()
+        assert '"super+k"' in tmpdir.join('Default (OSX).sublime-keymap').read()
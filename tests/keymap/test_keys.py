@@ -0,0 +1,59 @@
+from sublimedsl.keymap import bind, normalize_key, parse_key
+from pytest import mark, raises
+
+
+def describe_parse_key():
+
+    @mark.parametrize('key, expected', [
+        ('k', ((), 'k')),
+        ('ctrl+k', (('ctrl',), 'k')),
+        ('shift+super+k', (('super', 'shift'), 'k')),
+        ('shift+alt+ctrl+super+up', (('ctrl', 'super', 'alt', 'shift'), 'up')),
+        ('ctrl++', (('ctrl',), '+')),
+        ('+', ((), '+')),
+        ('shift+K', (('shift',), 'K')),
+    ])
+    def splits_modifiers_and_key_in_canonical_order(key, expected):
+        assert parse_key(key) == expected
+
+    @mark.parametrize('key, expected', [
+        ('cmd+option+k', (('super', 'alt'), 'k')),
+        ('Control+Shift+Esc', (('ctrl', 'shift'), 'escape')),
+        ('win+return', (('super',), 'enter')),
+    ])
+    def resolves_aliases(key, expected):
+        assert parse_key(key) == expected
+
+    def removes_duplicate_modifiers():
+        assert parse_key('ctrl+control+k') == (('ctrl',), 'k')
+
+    def accepts_named_keys():
+        assert parse_key('keypad_enter') == ((), 'keypad_enter')
+        assert parse_key('f12') == ((), 'f12')
+
+    def raises_ValueError_for_unknown_modifier():
+        with raises(ValueError):
+            parse_key('hyper+k')
+
+    def raises_ValueError_for_unknown_key():
+        with raises(ValueError):
+            parse_key('ctrl+foo')
+
+    def raises_ValueError_for_empty_key():
+        with raises(ValueError):
+            parse_key('ctrl+')
+
+
+def describe_normalize_key():
+
+    def returns_canonical_form():
+        assert normalize_key('shift+super+k') == normalize_key('super+shift+k') == 'super+shift+k'
+
+    def returns_same_object_for_repeated_calls():
+        assert normalize_key('shift+ctrl+x') is normalize_key('shift+ctrl+x')
+
+
+def describe_Binding_normalized_keys():
+
+    def returns_normalized_keys():
+        assert bind('shift+super+k', 'cmd+b').normalized_keys == ('super+shift+k', 'super+b')
@@ -0,0 +1,85 @@
+from sublimedsl.keymap import Keymap, Param, Template, bind, context, param, template
+from pytest import fixture, raises
+
+
+@fixture
+def subject():
+    return template(
+        bind(param('n', 'super+{}')).to('select_by_index', index=param('i'), group=0)
+            .when('setting.tabs').true()
+            .also(param('key')).equal(param('value')))  # nopep8
+
+
+def describe_Param():
+
+    def describe_resolve():
+
+        def returns_value_of_parameter():
+            assert Param('x').resolve({'x': 42}) == 42
+
+        def returns_formatted_value_when_format_is_set():
+            assert Param('x', 'super+{}').resolve({'x': 1}) == 'super+1'
+
+        def raises_KeyError_when_parameter_is_missing():
+            with raises(KeyError):
+                Param('x').resolve({})
+
+    def test_param_is_alias_for_Param():
+        assert param is Param
+
+
+def describe_expand():
+
+    def expands_placeholders_from_rows(subject):
+        result = list(subject.expand({'n': 1, 'i': 0, 'key': 'a', 'value': 'b'}))
+        assert result == [
+            bind('super+1').to('select_by_index', index=0, group=0)
+                .when('setting.tabs').true()
+                .also('a').equal('b')  # nopep8
+        ]
+
+    def expands_placeholders_from_columns(subject):
+        result = list(subject.expand(n=[1, 2], i=range(0, 2), key='xy', value=[True, False]))
+
+        assert [b.keys for b in result] == [('super+1',), ('super+2',)]
+        assert [b.args for b in result] == [{'index': 0, 'group': 0}, {'index': 1, 'group': 0}]
+        assert [b.context[1].key for b in result] == ['x', 'y']
+        assert [b.context[1].operand for b in result] == [True, False]
+
+    def is_lazy(subject):
+        def numbers():
+            yield 1
+            raise AssertionError('consumed too far')
+
+        result = subject.expand(n=numbers(), i=[0, 1], key='xy', value='ab')
+        assert next(result).keys == ('super+1',)
+
+    def shares_contexts_without_placeholders(subject):
+        first, second = subject.expand(n=[1, 2], i=[0, 1], key='xy', value='ab')
+        assert first.context[0] is second.context[0]
+        assert first.context[1] is not second.context[1]
+
+    def does_not_share_args(subject):
+        first, second = subject.expand(n=[1, 2], i=[0, 0], key='xy', value='ab')
+        assert first.args is not second.args
+
+    def is_not_affected_by_changes_of_original_binding():
+        binding = bind(param('k')).to('fire')
+        subject = Template(binding)
+        binding.to('water')
+
+        assert next(subject.expand(k='x')).command == 'fire'
+
+    def raises_ValueError_when_columns_have_different_lengths(subject):
+        with raises(ValueError):
+            list(subject.expand(n=[1, 2], i=[0], key='xy', value='ab'))
+
+    def can_be_passed_into_Keymap(subject):
+        keymap = Keymap(subject.expand(n=[1, 2], i=[0, 1], key='xy', value='ab'),
+                        common_context=[context('foo').true()])
+        assert len(keymap) == 2
+        assert [len(b.context) for b in keymap] == [3, 3]
+
+
+def test_template_is_alias_for_Template():
+    assert template is Template
@@ -0,0 +1,103 @@
+import tracemalloc
+
+from sublimedsl.columnar import ColumnarKeymap
+from sublimedsl.keymap import Keymap, bind, context
+from sublimedsl.memprofile import measure_common_context, measure_keymap, profile_keymap
+
+
+def build():
+    return [bind('super+%d' % i).to('select_by_index', index=i).when('foo').true()
+            for i in range(0, 10)]
+
+
+def describe_profile_keymap():
+
+    def reports_phases():
+        result = profile_keymap(build)
+
+        assert list(result.phases) == ['construct', 'preprocess', 'encode']
+        assert all(stats.peak >= 0 for stats in result.phases.values())
+        assert result.phases['construct'].allocated > 0
+        assert result.phases['construct'].blocks >= 10 * 2
+        assert result.phases['encode'].peak > 0
+
+    def does_not_reset_peak_of_caller():
+        tracemalloc.start()
+        try:
+            big = bytearray(1 << 20)
+            del big
+            result = profile_keymap(build)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak >= 1 << 20
+        assert all(stats.peak is None for stats in result.phases.values())
+        assert result.phases['construct'].blocks > 0
+
+    def passes_options_to_Keymap():
+        result = profile_keymap(build, common_context=[context('bar').true()])
+        assert result.common_context.references == 10
+
+    def renders_as_table():
+        text = str(profile_keymap(build))
+        assert 'preprocess' in text
+        assert 'Context' in text
+        assert 'Common context' in text
+
+
+def describe_measure_keymap():
+
+    def counts_objects_by_category():
+        result = measure_keymap(Keymap(build()))
+
+        assert result['Binding'].count > 10  # objects and strings
+        assert result['keys'].count == 10 * 2
+        assert result['context lists'].count == 10
+        assert all(stats.size > 0 for stats in result.values())
+
+    def counts_shared_objects_once():
+        ctx = context('bar').true()
+        one = measure_keymap(Keymap(bind('x').to('fire'), common_context=[ctx]))
+        two = measure_keymap(Keymap(bind('x').to('fire'), bind('y').to('fire'),
+                                    common_context=[ctx]))
+
+        assert one['Context'].count == two['Context'].count
+        assert one['context lists'].count + 1 == two['context lists'].count
+
+
+def describe_measure_common_context():
+
+    def computes_cost_of_repeating_common_context():
+        keymap = Keymap(build(), common_context=[context('bar').true(), context('baz').true()])
+        result = measure_common_context(keymap)
+
+        assert result.contexts == 2
+        assert result.references == 20
+        assert result.slot_bytes == 20 * 8
+        assert len(keymap.to_json()) - len(Keymap(build()).to_json()) == result.encoded_bytes
+
+    def computes_encoded_cost_for_bindings_without_own_context():
+        bindings = [bind('x').to('fire'), bind('y').to('fire').when('foo').true()]
+        keymap = Keymap(bindings, common_context=[context('bar').true()])
+        result = measure_common_context(keymap)
+
+        assert len(keymap.to_json()) - len(Keymap(bindings).to_json()) == result.encoded_bytes
+
+    def skips_common_contexts_already_present_in_bindings():
+        bindings = [bind('x').to('fire').when('bar').true(), bind('y').to('fire')]
+        keymap = Keymap(bindings, common_context=[context('bar').true(), context('baz').true()])
+        result = measure_common_context(keymap)
+
+        assert result.references == 3
+        assert len(keymap.to_json()) - len(Keymap(bindings).to_json()) == result.encoded_bytes
+
+    def measures_ColumnarKeymap_like_Keymap():
+        bindings = [bind('x').to('fire').when('foo').false(), bind('y').to('fire')] + build()
+        options = dict(common_context=[context('bar').true(), context('baz').true()])
+
+        expected = measure_common_context(Keymap(bindings, **options))
+        assert measure_common_context(ColumnarKeymap(bindings, **options)) == expected
+
+    def returns_zeros_without_common_context():
+        assert measure_common_context(Keymap(build())) == (0, 0, 0, 0)
@@ -0,0 +1,121 @@
+from sublimedsl.keymap import Keymap, bind
+from sublimedsl.resolver import Resolver, compile_regex, match_selector
+from pytest import fixture, mark
+
+
+@fixture
+def keymap():
+    fourth = bind('ctrl+k', 'ctrl+b').to('fourth')
+    fourth.when('selection_empty').all()
+
+    return Keymap(
+        bind('tab').to('first'),
+        bind('tab').to('second')
+            .when('selector').equal('text.asciidoc')
+            .also('preceding_text').regex_contains(r'^\s*$'),
+        bind('shift+super+k').to('third')
+            .when('setting.auto_match_enabled').true()
+            .also('following_text').all().not_regex_match(r'\w+'),
+        fourth
+    )  # nopep8
+
+@fixture
+def subject(keymap):
+    return Resolver(keymap)
+
+
+def describe_resolve():
+
+    def returns_later_binding_when_its_context_matches(subject):
+        result = subject.resolve('tab', selections=[
+            {'selector': 'text.asciidoc markup.list', 'preceding_text': '  '}])
+        assert result.command == 'second'
+
+    def falls_back_to_earlier_binding_when_context_does_not_match(subject):
+        result = subject.resolve('tab', selections=[
+            {'selector': 'text.asciidoc', 'preceding_text': 'foo'}])
+        assert result.command == 'first'
+
+    def treats_missing_context_values_as_not_matching(subject):
+        assert subject.resolve('tab').command == 'first'
+
+    def normalizes_keys(subject):
+        state = {'setting.auto_match_enabled': True}
+        assert subject.resolve('super+shift+k', state, [{'following_text': ''}]).command == 'third'
+
+    def takes_value_from_state_when_not_in_selection(subject):
+        state = {'setting.auto_match_enabled': True, 'following_text': ''}
+        assert subject.resolve('shift+super+k', state).command == 'third'
+
+    def returns_None_when_no_binding_matches(subject):
+        assert subject.resolve('shift+super+k', {'setting.auto_match_enabled': False}) is None
+        assert subject.resolve('f5') is None
+
+    def context_match_all():
+
+        def requires_all_selections_to_match(subject):
+            state = {'setting.auto_match_enabled': True}
+            selections = [{'following_text': ''}, {'following_text': 'abc'}]
+            assert subject.resolve('super+shift+k', state, selections) is None
+
+        def defaults_operator_to_equal_and_operand_to_true(subject):
+            selections = [{'selection_empty': True}, {'selection_empty': True}]
+            assert subject.resolve(['ctrl+k', 'ctrl+b'], {}, selections).command == 'fourth'
+            selections[1]['selection_empty'] = False
+            assert subject.resolve(['ctrl+k', 'ctrl+b'], {}, selections) is None
+
+    def context_match_any():
+
+        def requires_one_selection_to_match():
+            subject = Resolver([bind('x').to('fire').when('text').any().equal('a')])
+            assert subject.resolve('x', selections=[{'text': 'b'}, {'text': 'a'}]) is not None
+
+    @mark.parametrize('operator, operand, value, expected', [
+        ('equal', 42, 42, True),
+        ('not_equal', 42, 42, False),
+        ('regex_match', 'a+', 'aaa', True),
+        ('regex_match', 'a+', 'aab', False),
+        ('not_regex_match', 'a+', 'aab', True),
+        ('regex_contains', 'b', 'aab', True),
+        ('not_regex_contains', 'b', 'aab', False),
+    ])
+    def evaluates_operators(operator, operand, value, expected):
+        binding = bind('x').to('fire')
+        getattr(binding.when('foo'), operator)(operand)
+        subject = Resolver([binding])
+
+        assert (subject.resolve('x', {'foo': value}) is binding) == expected
+
+
+def describe_candidates():
+
+    def returns_bindings_of_keys_in_order(subject):
+        assert [b.command for b in subject.candidates('tab')] == ['first', 'second']
+
+
+def describe_match_selector():
+
+    @mark.parametrize('selector, scope, expected', [
+        ('text.asciidoc', 'text.asciidoc', True),
+        ('text', 'text.asciidoc markup.bold', True),
+        ('text.asc', 'text.asciidoc', False),
+        ('markup.bold', 'text.asciidoc markup.bold.asciidoc', True),
+        ('text markup', 'text.asciidoc markup.bold', True),
+        ('markup text', 'text.asciidoc markup.bold', False),
+        ('source.js, text.asciidoc', 'text.asciidoc', True),
+        ('source.js | text.asciidoc', 'text.asciidoc', True),
+        ('text - markup.bold', 'text.asciidoc markup.bold', False),
+        ('text - markup.italic', 'text.asciidoc markup.bold', True),
+    ])
+    def matches_scope(selector, scope, expected):
+        assert match_selector(selector, scope) is expected
+
+
+def describe_compile_regex():
+
+    def returns_cached_pattern():
+        assert compile_regex('a+b') is compile_regex('a+b')
+
+    def anchors_pattern_when_full():
+        assert compile_regex('a|b', full=True).search('ab') is None
+        assert compile_regex('a|b', full=True).search('b')
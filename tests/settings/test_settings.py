@@ -0,0 +1,80 @@
+import json
+from collections import OrderedDict
+from io import StringIO
+from sublimedsl.encoder import FILE_HEADER, jsonify
+from sublimedsl.settings import Settings
+from pytest import fixture
+
+
+@fixture
+def subject():
+    return Settings({'b': 1}, [('a', [1, 2])], c={'y': 1, 'x': None}, d=None)
+
+
+def describe_init():
+
+    def adds_settings_in_order(subject):
+        assert list(subject) == ['b', 'a', 'c', 'd']
+        assert subject['a'] == [1, 2]
+
+
+def describe_set():
+
+    def sets_value_and_returns_self(subject):
+        assert subject.set('e', 5) is subject
+        assert subject['e'] == 5
+
+    def keeps_position_when_replacing(subject):
+        subject.set('b', 2)
+        assert list(subject) == ['b', 'a', 'c', 'd']
+
+
+def describe_update():
+
+    def sets_all_given_settings(subject):
+        subject.update(Settings(a=0), {'z': 1}, y=2)
+        assert [(k, subject[k]) for k in subject][-3:] == [('d', None), ('z', 1), ('y', 2)]
+        assert subject['a'] == 0
+
+
+def describe_to_json():
+
+    def dumps_settings_in_order_and_omits_None(subject):
+        expected = jsonify(OrderedDict([('b', 1), ('a', [1, 2]), ('c', {'y': 1, 'x': None})]))
+        assert subject.to_json() == expected
+
+    def produces_empty_object_when_empty():
+        assert Settings().to_json() == '{}'
+
+    def accepts_json_options(subject):
+        assert json.loads(subject.to_json(indent=None))['a'] == [1, 2]
+        assert subject.to_json(indent=None) == jsonify(
+            OrderedDict([('b', 1), ('a', [1, 2]), ('c', {'y': 1, 'x': None})]), indent=None)
+
+
+def describe_dump():
+
+    def writes_file_header_and_json(subject):
+        fp = StringIO()
+        subject.dump(fp=fp)
+        assert fp.getvalue() == FILE_HEADER + subject.to_json() + '\n'
+
+
+def describe_stream():
+
+    def writes_same_output_as_dump(subject):
+        expected, actual = StringIO(), StringIO()
+        subject.dump(fp=expected)
+
+        Settings.stream({'b': 1}, ((k, v) for k, v in [('a', [1, 2])]),
+                        {'c': {'y': 1, 'x': None}, 'd': None}, fp=actual)
+
+        assert actual.getvalue() == expected.getvalue()
+
+
+def describe_eq():
+
+    def compares_settings():
+        assert Settings(a=1) == Settings({'a': 1})
+        assert Settings(a=1) != Settings(a=2)
+        assert Settings(a=1) != {'a': 1}
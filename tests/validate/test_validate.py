@@ -0,0 +1,67 @@
+from sublimedsl.keymap import Keymap, bind
+from sublimedsl.resolver import Resolver, compile_regex
+from sublimedsl.validate import _analyze, check_regex, validate_regexes
+from pytest import mark
+
+
+def describe_validate_regexes():
+
+    def returns_problems_with_bindings_and_contexts():
+        broken = bind('y').to('fire').when('text').regex_match('(unclosed')
+        keymap = Keymap(
+            bind('x').to('fire').when('preceding_text').regex_contains(r'^\s*$'),
+            broken,
+            bind('z').to('fire').when('text').equal('(unclosed'))
+
+        result = validate_regexes(keymap)
+
+        assert len(result) == 1
+        assert result[0].binding == broken
+        assert result[0].context.operand == '(unclosed'
+        assert 'Invalid regex' in result[0].message
+
+    def checks_each_distinct_pattern_once():
+        _analyze.cache_clear()
+        compile_regex.cache_clear()
+        keymap = [bind(k).to('fire').when('text').not_regex_contains('(a+)+') for k in 'xyz']
+
+        result = validate_regexes(keymap)
+
+        assert len(result) == 3
+        assert _analyze.cache_info().misses == 1
+        assert compile_regex.cache_info().misses == 1
+
+    def shares_compiled_patterns_with_resolver():
+        compile_regex.cache_clear()
+        keymap = Keymap(bind('x').to('fire').when('text').regex_match('a+'),
+                        bind('y').to('fire').when('text').regex_contains('a+'))
+        validate_regexes(keymap)
+        Resolver(keymap)
+
+        assert compile_regex.cache_info().misses == 2
+
+
+def describe_check_regex():
+
+    @mark.parametrize('pattern', [r'^\s*$', r'(a|b)+c', r'\w+\s\w+', r'(?:ab){2,5}', '',
+                                  r'((ab)*c)+', r'(a*c)+', r'(ab|a)+', r'(\d+,)*\d+',
+                                  r'[\w\d]+', r'(ab|ac)+', r'([^,]*,)*x', r'(\w+\.)*\w+', r'[|]+'])
+    def returns_None_for_valid_patterns(pattern):
+        assert check_regex(pattern) is None
+
+    @mark.parametrize('pattern', ['(', '[a-', '*a', '(?P<x>a)(?P<x>b)', '(?<=a+)b'])
+    def reports_invalid_patterns(pattern):
+        assert 'Invalid regex' in check_regex(pattern)
+
+    @mark.parametrize('pattern', [r'\h+', '(?<n>a)'])
+    def reports_syntax_not_supported_by_python_as_python_dialect(pattern):
+        assert "in Python's re dialect" in check_regex(pattern)
+
+    @mark.parametrize('pattern', [r'(a+)+$', r'(a*)*b', r'(?:x|(\d+))*', r'(a|aa)+',
+                                  r'(\d|\d\d)+$', r'(a*a)+', r'(x?a+)*', r'(.*,)*x', r'(\w|\d)+$',
+                                  r'(\w+\d)+'])
+    def reports_ambiguous_quantifiers(pattern):
+        assert 'catastrophically' in check_regex(pattern)
+
+    def reports_non_string_operand():
+        assert 'must be a string' in check_regex(42)
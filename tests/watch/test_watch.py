@@ -0,0 +1,119 @@
+import os
+from sublimedsl import watch
+from sublimedsl.watch import Watcher, compile_source, find_sources, output_path
+from pytest import fixture
+
+
+SOURCE = '''\
+from sublimedsl.keymap import *
+from {fragment} import bindings
+
+Keymap(bindings).dump()
+'''
+
+@fixture
+def tree(tmpdir):
+    tmpdir.join('watchfrag_a.py').write(fragment('a'))
+    tmpdir.join('watchfrag_b.py').write(fragment('b'))
+    tmpdir.join('A.sublime-keymap.py').write(SOURCE.format(fragment='watchfrag_a'))
+    tmpdir.join('B.sublime-keymap.py').write(SOURCE.format(fragment='watchfrag_b'))
+    return tmpdir
+
+
+def fragment(command):
+    return "from sublimedsl.keymap import bind\nbindings = [bind('x').to(%r)]\n" % command
+
+
+def touch(file, content):
+    file.write(content)
+    stat = os.stat(str(file))
+    os.utime(str(file), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def describe_find_sources():
+
+    def finds_keymap_scripts_recursively(tree):
+        tree.mkdir('sub').join('C.sublime-keymap.py').write('')
+        result = find_sources([str(tree)])
+        assert [os.path.basename(f) for f in result] == [
+            'A.sublime-keymap.py', 'B.sublime-keymap.py', 'C.sublime-keymap.py']
+
+
+def describe_output_path():
+
+    def strips_py_suffix():
+        assert output_path('/x/Default.sublime-keymap.py') == '/x/Default.sublime-keymap'
+
+
+def describe_compile_source():
+
+    def writes_output_and_returns_local_dependencies(tree):
+        source = str(tree.join('A.sublime-keymap.py'))
+        deps = compile_source(source)
+
+        assert deps == {str(tree.join('watchfrag_a.py'))}
+        assert '"command": "a"' in tree.join('A.sublime-keymap').read()
+
+    def reloads_changed_fragments(tree):
+        source = str(tree.join('A.sublime-keymap.py'))
+        compile_source(source)
+        tree.join('watchfrag_a.py').write(fragment('changed'))
+        compile_source(source)
+
+        assert '"command": "changed"' in tree.join('A.sublime-keymap').read()
+
+
+def describe_Watcher():
+
+    @fixture
+    def subject(tree):
+        watcher = Watcher([str(tree)], debounce=0)
+        watcher.build_all()
+        return watcher
+
+    def build_all_generates_all_outputs(subject, tree):
+        assert tree.join('A.sublime-keymap').check()
+        assert tree.join('B.sublime-keymap').check()
+
+    def poll_returns_nothing_when_nothing_changed(subject):
+        assert subject.poll() == []
+
+    def poll_regenerates_only_sources_depending_on_changed_fragment(subject, tree):
+        touch(tree.join('watchfrag_b.py'), fragment('changed'))
+
+        assert subject.poll() == [str(tree.join('B.sublime-keymap.py'))]
+        assert '"command": "changed"' in tree.join('B.sublime-keymap').read()
+        assert '"command": "a"' in tree.join('A.sublime-keymap').read()
+
+    def poll_regenerates_changed_source(subject, tree):
+        touch(tree.join('A.sublime-keymap.py'), SOURCE.format(fragment='watchfrag_b'))
+
+        assert subject.poll() == [str(tree.join('A.sublime-keymap.py'))]
+        assert '"command": "b"' in tree.join('A.sublime-keymap').read()
+
+    def poll_generates_new_source(subject, tree):
+        tree.join('C.sublime-keymap.py').write(SOURCE.format(fragment='watchfrag_a'))
+
+        assert subject.poll() == [str(tree.join('C.sublime-keymap.py'))]
+        assert tree.join('C.sublime-keymap').check()
+
+    def survives_broken_source(subject, tree):
+        touch(tree.join('A.sublime-keymap.py'), 'raise Exception("oops")')
+        assert subject.poll() == [str(tree.join('A.sublime-keymap.py'))]
+
+    def detects_changes_made_during_build(subject, tree, mocker):
+        build = watch.build
+
+        def build_and_edit(sources):
+            results = build(sources)
+            touch(tree.join('watchfrag_b.py'), fragment('changed'))
+            return results
+
+        mocker.patch.object(watch, 'build', side_effect=build_and_edit)
+        touch(tree.join('A.sublime-keymap.py'), SOURCE.format(fragment='watchfrag_a'))
+        assert subject.poll() == [str(tree.join('A.sublime-keymap.py'))]
+
+        mocker.stopall()
+        assert subject.poll() == [str(tree.join('B.sublime-keymap.py'))]
+        assert '"command": "changed"' in tree.join('B.sublime-keymap').read()
+        assert subject.poll() == []